@@ -1,16 +1,27 @@
 import os
+import re
+import hashlib
+import html
+import gzip
 import json
 import sqlite3
 import time
+import shutil
 import datetime
+import tempfile
+import threading
 import requests
 import random
+import numpy as np
 import pandas as pd
 import easyocr
 from io import BytesIO
 import plotly.express as px
+import plotly.io as pio
 import streamlit as st
 from pathlib import Path
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 from azure.ai.inference import ChatCompletionsClient
 import sqlalchemy
@@ -26,6 +37,7 @@ from azure.ai.inference.models import (
 )
 from azure.core.credentials import AzureKeyCredential
 from supabase import create_client, Client
+from supabase.client import ClientOptions
 from PIL import Image
 import pytesseract
 import PyPDF2
@@ -34,12 +46,6 @@ from transformers import pipeline
 
 load_dotenv()
 
-# Supabase client initialization
-supabase: Client = create_client(
-    supabase_url=st.secrets["SUPABASE_URL"],
-    supabase_key=st.secrets["SUPABASE_KEY"]
-)
-
 st.set_page_config(
     page_title="GATE DA 2026 Dashboard",
     layout="wide",
@@ -57,49 +63,121 @@ try:
 except ImportError:
     Image = None
     pytesseract = None
+# Optional: for PDF thumbnails
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+# Optional: lets storage retries recognise Supabase network errors (httpx ships with supabase)
+try:
+    import httpx
+except ImportError:
+    httpx = None
+# Optional: for Parquet exports
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Static Assets
+STATIC_DIR = Path("static")
+CSS_ENTRY = "style.css"
+CSS_IMPORT_PATTERN = re.compile(r"""@import\s+(?:url\()?['"]?([^'")\s;]+)['"]?\)?\s*;""")
+
+def resolve_css_import(name, base_dir):
+    """Finds an @import target; a stale path falls back to a same-named file (singular or plural) under STATIC_DIR."""
+    candidate = base_dir / name
+    if candidate.exists():
+        return candidate
+    stem = Path(name).stem
+    matches = sorted(path for path in STATIC_DIR.rglob("*.css") if path.stem in {stem, stem.rstrip("s")})
+    return matches[0] if matches else None
+
+def collect_css(path, seen):
+    """Returns a stylesheet with its @imports inlined in order, including each file only once."""
+    path = path.resolve()
+    if path in seen:
+        return ""
+    seen.add(path)
+
+    def inline(match):
+        target = resolve_css_import(match.group(1), path.parent)
+        return collect_css(target, seen) if target else ""
+
+    return CSS_IMPORT_PATTERN.sub(inline, path.read_text(encoding="utf-8"))
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+@st.cache_resource
+def build_css_bundle():
+    """Resolves, concatenates and minifies the stylesheet tree once per process."""
+    entry = STATIC_DIR / CSS_ENTRY
+    files = set()
+    css = minify_css(collect_css(entry, files)) if entry.exists() else ""
+    return {"css": css, "hash": hashlib.sha256(css.encode()).hexdigest()[:12], "files": files}
+
+@st.cache_resource
+def build_page_css(page_name):
+    """Minified stylesheet for a page, or "" when it has none or the main bundle already includes it."""
+    path = STATIC_DIR / "pages" / f"{page_name.lower().replace(' ', '_')}.css"
+    if not path.exists() or path.resolve() in build_css_bundle()["files"]:
+        return ""
+    return minify_css(path.read_text(encoding="utf-8"))
 
 def load_css():
-    """Load all CSS files from the static directory"""
-    css_directory = Path("static/css")
-
-    # First load base styles
-    base_styles = [
-        css_directory / "base/reset.css",
-        css_directory / "base/variables.css",
-        css_directory / "base/typography.css",
-        css_directory / "base/animations.css"
-    ]
+    """Injects the cached stylesheet bundle"""
+    bundle = build_css_bundle()
+    if bundle["css"]:
+        st.markdown(f'<style data-bundle="{bundle["hash"]}">{bundle["css"]}</style>', unsafe_allow_html=True)
 
-    css_content = []
-
-    # Load base styles first
-    for css_file in base_styles:
-        if css_file.exists():
-            with open(css_file) as f:
-                css_content.append(f.read())
+def load_page_specific_css(page_name):
+    """Load page-specific CSS"""
+    css = build_page_css(page_name)
+    if css:
+        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
-    # Load main style.css which imports everything else
-    main_style = css_directory / "style.css"
-    if main_style.exists():
-        with open(main_style) as f:
-            css_content.append(f.read())
+LOGO_PATH = STATIC_DIR / "images" / "logos" / "app-logo.png"
+LOGO_CACHE_DIR = STATIC_DIR / "cache"
+# Rendered logo variants as name -> (pixel size, image format)
+LOGO_VARIANTS = {"header": (96, "WEBP"), "favicon": (32, "PNG")}
 
-    # Combine all CSS and inject
-    combined_css = "\n".join(css_content)
-    st.markdown(f"<style>{combined_css}</style>", unsafe_allow_html=True)
+@st.cache_resource
+def get_logo_urls():
+    """Returns {variant: static URL} for the logo, resizing it once per process.
 
-def load_page_specific_css(page_name):
-    """Load page-specific CSS"""
-    css_file = Path(f"static/css/pages/{page_name.lower().replace(' ', '_')}.css")
-    if css_file.exists():
-        with open(css_file) as f:
-            st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    Variants are named by the logo's content hash so browsers can cache them indefinitely.
+    Without Pillow every variant points at the original file. Returns {} when the logo is missing.
+    """
+    if not LOGO_PATH.exists():
+        return {}
+    urls = dict.fromkeys(LOGO_VARIANTS, static_url(LOGO_PATH))
+    if Image is None:
+        return urls
+
+    logo_hash = hashlib.sha256(LOGO_PATH.read_bytes()).hexdigest()[:12]
+    LOGO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for variant, (size, image_format) in LOGO_VARIANTS.items():
+        path = LOGO_CACHE_DIR / f"app-logo-{logo_hash}-{size}.{image_format.lower()}"
+        if not path.exists():
+            with Image.open(LOGO_PATH) as logo:
+                variant_image = logo.convert("RGBA")
+            variant_image.thumbnail((size, size))
+            variant_image.save(path, format=image_format)
+        urls[variant] = static_url(path)
+    return urls
 
 def create_header():
     """Create the app header with logo and title"""
     header_html = """
         <div class="app-header">
-            <img src="data:image/png;base64,{}" class="app-logo">
+            <img src="{}" class="app-logo">
             <div class="app-header-content">
                 <h1 class="app-title">GATE DA 2026</h1>
                 <p class="app-subtitle">Study Dashboard & Planner</p>
@@ -107,163 +185,795 @@ def create_header():
         </div>
     """
 
-    # Read the logo image
-    logo_path = Path("static/images/logos/app-logo.png")
-    if logo_path.exists():
-        import base64
-        with open(logo_path, "rb") as f:
-            logo_data = base64.b64encode(f.read()).decode()
-
-        # Display the header
-        st.markdown(header_html.format(logo_data), unsafe_allow_html=True)
+    logo_urls = get_logo_urls()
+    if logo_urls:
+        st.markdown(header_html.format(logo_urls["header"]), unsafe_allow_html=True)
     else:
         st.error("Logo file not found!")
 
 def set_favicon():
     """Set a custom favicon"""
-    favicon_path = Path("static/images/logos/app-logo.png")
-    if favicon_path.exists():
-        import base64
-        with open(favicon_path, "rb") as f:
-            favicon_data = base64.b64encode(f.read()).decode()
-
-        favicon_html = f"""
-            <link rel="shortcut icon" href="data:image/png;base64,{favicon_data}">
+    logo_urls = get_logo_urls()
+    if logo_urls:
+        st.markdown(f'<link rel="shortcut icon" href="{logo_urls["favicon"]}">', unsafe_allow_html=True)
+
+def get_secret(name, default=None):
+    """Reads a setting from Streamlit secrets, falling back to the environment."""
+    try:
+        return st.secrets[name]
+    except Exception:
+        return os.getenv(name, default)
+
+# Storage Backends
+SQLITE_PATH = "data_hub.db"
+SQLITE_POOL_SIZE = 5
+SUPABASE_TIMEOUT_SECONDS = 10
+HEALTH_CHECK_INTERVAL_SECONDS = 30
+# Above HealthCheckedStorage's worst case: a timed-out query plus its forced health-check ping
+STORAGE_CALL_TIMEOUT_SECONDS = 2 * SUPABASE_TIMEOUT_SECONDS + 5
+STORAGE_READ_RETRIES = 3
+STORAGE_RETRY_BASE_DELAY = 0.2
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 30
+STALE_CACHE_SIZE = 256
+# The stale cache holds at most this many rows in total; larger results are not kept at all
+STALE_CACHE_MAX_ROWS = 5000
+STALE_CACHE_MAX_RESULT_ROWS = 500
+LATENCY_SAMPLE_SIZE = 200
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Filter keys may carry a comparison suffix, e.g. {"due_date__lte": "2026-01-01"}
+FILTER_OPERATORS = {"lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+SQLITE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS progress_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        phase TEXT NOT NULL,
+        subject TEXT NOT NULL,
+        hours REAL NOT NULL,
+        notes TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS schedule (
+        phase TEXT PRIMARY KEY,
+        title TEXT,
+        focus TEXT,
+        schedule_json TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS schedule_slots (
+        phase TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        day TEXT,
+        time_slot TEXT,
+        activity TEXT,
+        details TEXT,
+        PRIMARY KEY (phase, position)
+    )""",
+    """CREATE TABLE IF NOT EXISTS question_bank (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject TEXT NOT NULL,
+        question TEXT NOT NULL,
+        answer TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS resources (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject TEXT,
+        title TEXT,
+        link TEXT,
+        filename TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS study_goals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        description TEXT,
+        target_hours REAL,
+        achieved_hours REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS revision_notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject TEXT NOT NULL,
+        short_notes TEXT,
+        formula TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS mock_attempts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT,
+        submitted_at TEXT,
+        duration_minutes INTEGER,
+        total INTEGER,
+        correct INTEGER,
+        unscored INTEGER,
+        score REAL,
+        results_json TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS review_state (
+        item_type TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        ease REAL NOT NULL,
+        interval_days INTEGER NOT NULL,
+        repetitions INTEGER NOT NULL,
+        due_date TEXT NOT NULL,
+        last_reviewed TEXT,
+        PRIMARY KEY (item_type, item_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS app_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS subject_accuracy (
+        subject TEXT PRIMARY KEY,
+        attempted INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_progress_logs_date ON progress_logs(date)",
+    "CREATE INDEX IF NOT EXISTS idx_progress_logs_subject ON progress_logs(subject)",
+    "CREATE INDEX IF NOT EXISTS idx_progress_logs_phase ON progress_logs(phase)",
+    "CREATE INDEX IF NOT EXISTS idx_question_bank_subject ON question_bank(subject)",
+    "CREATE INDEX IF NOT EXISTS idx_resources_subject ON resources(subject)",
+    "CREATE INDEX IF NOT EXISTS idx_revision_notes_subject ON revision_notes(subject)",
+    "CREATE INDEX IF NOT EXISTS idx_review_state_due ON review_state(due_date)",
+    "CREATE INDEX IF NOT EXISTS idx_resources_filename ON resources(filename)"
+]
+
+# Columns added after the original data_hub.db schema, as (table, column, type)
+SQLITE_MIGRATIONS = [
+    ("resources", "blob_hash", "TEXT"),
+    ("resources", "original_name", "TEXT"),
+    ("study_goals", "auto_track", "INTEGER DEFAULT 0"),
+    ("study_goals", "subject", "TEXT"),
+    ("study_goals", "phase", "TEXT"),
+    ("study_goals", "start_date", "TEXT"),
+    ("study_goals", "end_date", "TEXT")
+]
+
+class SupabaseStorage:
+    """Storage backend that talks to the hosted Supabase project."""
+
+    name = "supabase"
+
+    def __init__(self, url, key, timeout=SUPABASE_TIMEOUT_SECONDS):
+        self.url = url
+        self.key = key
+        self.timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Creates the client on first use; it keeps one keep-alive HTTP session for every later call."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not self.url or not self.key:
+                        raise ConnectionError("SUPABASE_URL and SUPABASE_KEY must be set to use Supabase.")
+                    self._client = create_client(
+                        supabase_url=self.url,
+                        supabase_key=self.key,
+                        options=ClientOptions(postgrest_client_timeout=self.timeout)
+                    )
+        return self._client
+
+    def ping(self):
+        self.client.table("schedule").select("phase").limit(1).execute()
+
+    def _filtered(self, query, filters):
+        for column, value in (filters or {}).items():
+            column, _, op = column.partition("__")
+            if op:
+                query = getattr(query, op)(column, value)
+            elif isinstance(value, (list, tuple)):
+                query = query.in_(column, list(value))
+            else:
+                query = query.eq(column, value)
+        return query
+
+    def select(self, table, columns="*", filters=None, order=None, desc=False, offset=0, limit=None):
+        query = self._filtered(self.client.table(table).select(columns), filters)
+        for column in order.split(",") if order else []:
+            query = query.order(column.strip(), desc=desc)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        return query.execute().data or []
+
+    def table_stats(self, table, key="id", filters=None):
+        query = self._filtered(self.client.table(table).select(key, count="exact"), filters)
+        response = query.order(key, desc=True).limit(1).execute()
+        return response.count or 0, response.data[0][key] if response.data else None
+
+    def insert(self, table, rows):
+        return self.client.table(table).insert(rows).execute().data or []
+
+    def update(self, table, values, filters):
+        return self._filtered(self.client.table(table).update(values), filters).execute().data or []
+
+    def delete(self, table, filters):
+        return self._filtered(self.client.table(table).delete(), filters).execute().data or []
+
+    def upsert(self, table, rows, on_conflict, ignore_duplicates=False):
+        query = self.client.table(table).upsert(
+            rows, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates
+        )
+        return query.execute().data or []
+
+    def increment(self, table, column, amounts, key="id"):
+        # PostgREST has no atomic "column = column + x", so this goes through a SQL function (see README)
+        params = {"ids": list(amounts), "amounts": [float(a) for a in amounts.values()]}
+        return self.client.rpc(f"increment_{table}_{column}", params).execute().data or []
+
+class SQLiteStorage:
+    """Storage backend on the local data_hub.db file through a pooled SQLAlchemy engine."""
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH):
+        self.engine = create_engine(
+            f"sqlite:///{path}",
+            poolclass=sqlalchemy.pool.QueuePool,
+            pool_size=SQLITE_POOL_SIZE,
+            max_overflow=SQLITE_POOL_SIZE,
+            pool_pre_ping=True,
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        sqlalchemy.event.listen(self.engine, "connect", self._configure_connection)
+
+        with self.engine.begin() as conn:
+            for statement in SQLITE_SCHEMA:
+                conn.execute(text(statement))
+            for table, column, column_type in SQLITE_MIGRATIONS:
+                existing = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+                if column not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    @staticmethod
+    def _identifier(name):
+        if not IDENTIFIER_PATTERN.match(name):
+            raise ValueError(f"Invalid identifier: {name}")
+        return name
+
+    def _where(self, filters):
+        if not filters:
+            return "", {}
+        clauses = []
+        params = {}
+        for key, value in filters.items():
+            column, _, op = key.partition("__")
+            if op:
+                clauses.append(f"{self._identifier(column)} {FILTER_OPERATORS[op]} :w_{key}")
+                params[f"w_{key}"] = value
+            elif isinstance(value, (list, tuple)):
+                names = [f"w_{column}_{i}" for i in range(len(value))]
+                clauses.append(f"{self._identifier(column)} IN ({', '.join(':' + n for n in names) or 'NULL'})")
+                params.update(zip(names, value))
+            else:
+                clauses.append(f"{self._identifier(column)} = :w_{column}")
+                params[f"w_{column}"] = value
+        return " WHERE " + " AND ".join(clauses), params
+
+    def select(self, table, columns="*", filters=None, order=None, desc=False, offset=0, limit=None):
+        if columns != "*":
+            columns = ", ".join(self._identifier(c.strip()) for c in columns.split(","))
+        where, params = self._where(filters)
+        sql = f"SELECT {columns} FROM {self._identifier(table)}{where}"
+        if order:
+            direction = "DESC" if desc else "ASC"
+            sql += " ORDER BY " + ", ".join(f"{self._identifier(c.strip())} {direction}" for c in order.split(","))
+        if limit is not None:
+            sql += " LIMIT :limit OFFSET :offset"
+            params.update(limit=limit, offset=offset)
+        with self.engine.connect() as conn:
+            return [dict(row) for row in conn.execute(text(sql), params).mappings()]
+
+    def table_stats(self, table, key="id", filters=None):
+        key = self._identifier(key)
+        where, params = self._where(filters)
+        sql = f"SELECT COUNT(*) AS n, MAX({key}) AS latest FROM {self._identifier(table)}{where}"
+        with self.engine.connect() as conn:
+            row = conn.execute(text(sql), params).mappings().one()
+        return row["n"], row["latest"]
+
+    def insert(self, table, rows):
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        if not rows:
+            return []
+        columns = [self._identifier(c) for c in rows[0]]
+        sql = (
+            f"INSERT INTO {self._identifier(table)} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + c for c in columns)}) RETURNING *"
+        )
+        with self.engine.begin() as conn:
+            return [dict(conn.execute(text(sql), row).mappings().one()) for row in rows]
+
+    def update(self, table, values, filters):
+        where, params = self._where(filters)
+        assignments = ", ".join(f"{self._identifier(c)} = :v_{c}" for c in values)
+        params.update({f"v_{c}": v for c, v in values.items()})
+        sql = f"UPDATE {self._identifier(table)} SET {assignments}{where} RETURNING *"
+        with self.engine.begin() as conn:
+            return [dict(row) for row in conn.execute(text(sql), params).mappings()]
+
+    def delete(self, table, filters):
+        where, params = self._where(filters)
+        sql = f"DELETE FROM {self._identifier(table)}{where} RETURNING *"
+        with self.engine.begin() as conn:
+            return [dict(row) for row in conn.execute(text(sql), params).mappings()]
+
+    def upsert(self, table, rows, on_conflict, ignore_duplicates=False):
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        if not rows:
+            return []
+        columns = [self._identifier(c) for c in rows[0]]
+        conflict = ", ".join(self._identifier(c.strip()) for c in on_conflict.split(","))
+        if ignore_duplicates:
+            action = "NOTHING"
+        else:
+            action = "UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in columns)
+        sql = (
+            f"INSERT INTO {self._identifier(table)} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(':' + c for c in columns)}) "
+            f"ON CONFLICT ({conflict}) DO {action} RETURNING *"
+        )
+        with self.engine.begin() as conn:
+            return [dict(row) for values in rows for row in conn.execute(text(sql), values).mappings()]
+
+    def increment(self, table, column, amounts, key="id"):
+        """Atomically adds amounts[k] to column for the row whose key column is k, in one transaction."""
+        column = self._identifier(column)
+        sql = (
+            f"UPDATE {self._identifier(table)} SET {column} = COALESCE({column}, 0) + :amount "
+            f"WHERE {self._identifier(key)} = :id RETURNING *"
+        )
+        with self.engine.begin() as conn:
+            return [
+                dict(row)
+                for row_id, amount in amounts.items()
+                for row in conn.execute(text(sql), {"id": row_id, "amount": amount}).mappings()
+            ]
+
+class DatabaseUnreachableError(ConnectionError):
+    """Raised without contacting the database while it is failing its health check."""
+
+class HealthCheckedStorage:
+    """Wraps a remote backend with periodic health checks so an outage fails fast.
+
+    While the primary fails its health check, every call raises DatabaseUnreachableError at once
+    instead of waiting out a network timeout, which lets callers such as load_table_frame fall back
+    to their stale snapshots. ResilientStorage does not retry that error.
+    """
+
+    def __init__(self, primary, interval=HEALTH_CHECK_INTERVAL_SECONDS):
+        self.primary = primary
+        self.name = primary.name
+        self.interval = interval
+        self.healthy = True
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    def check_health(self, force=False):
+        """Pings the primary at most once per interval unless forced; returns whether it is reachable."""
+        with self.lock:
+            now = time.monotonic()
+            if not force and self.checked_at is not None and now - self.checked_at < self.interval:
+                return self.healthy
+            self.checked_at = now
+        try:
+            self.primary.ping()
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+        return self.healthy
+
+    def _read(self, method, *args, **kwargs):
+        if not self.check_health():
+            raise DatabaseUnreachableError("The database is unreachable.")
+        try:
+            return getattr(self.primary, method)(*args, **kwargs)
+        except Exception:
+            # Re-check so the next calls fail fast if this was the connection, not the query
+            self.check_health(force=True)
+            raise
+
+    def _write(self, method, *args, **kwargs):
+        if not self.check_health():
+            raise DatabaseUnreachableError("The database is unreachable, so changes cannot be saved right now.")
+        return getattr(self.primary, method)(*args, **kwargs)
+
+    def select(self, *args, **kwargs):
+        return self._read("select", *args, **kwargs)
+
+    def table_stats(self, *args, **kwargs):
+        return self._read("table_stats", *args, **kwargs)
+
+    def insert(self, *args, **kwargs):
+        return self._write("insert", *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._write("update", *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._write("delete", *args, **kwargs)
+
+    def upsert(self, *args, **kwargs):
+        return self._write("upsert", *args, **kwargs)
+
+    def increment(self, *args, **kwargs):
+        return self._write("increment", *args, **kwargs)
+
+class CircuitOpenError(ConnectionError):
+    """Raised when the circuit breaker is open and no stale result is cached for a call."""
+
+# Errors worth retrying and counting toward the breaker; anything else (a missing table, a bad
+# identifier) fails the same way every time and is raised straight away
+TRANSIENT_STORAGE_ERRORS = (ConnectionError, TimeoutError, FutureTimeoutError) + (
+    (httpx.TransportError,) if httpx is not None else ()
+)
+
+class ResilientStorage:
+    """Adds read timeouts and retries, a circuit breaker and per-operation metrics to a backend.
+
+    Reads time out, retry transient errors with exponential backoff and, while the breaker is open,
+    return the last good result for the same call. Writes run without a timeout and are never
+    retried: a write abandoned mid-flight could still land, and inserts are not idempotent.
+    Only TRANSIENT_STORAGE_ERRORS count toward the breaker.
+    """
+
+    READ_METHODS = {"select", "table_stats"}
+
+    def __init__(self, storage, timeout=STORAGE_CALL_TIMEOUT_SECONDS):
+        self.storage = storage
+        self.name = storage.name
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="storage-call")
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.stale = OrderedDict()
+        self.stale_rows = 0
+        self.metrics = defaultdict(lambda: {
+            "calls": 0, "errors": 0, "retries": 0, "stale": 0,
+            "total_seconds": 0.0, "latencies": deque(maxlen=LATENCY_SAMPLE_SIZE)
+        })
+
+    @property
+    def healthy(self):
+        return self.opened_at is None and getattr(self.storage, "healthy", True)
+
+    def _circuit_open(self):
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if time.monotonic() - self.opened_at >= CIRCUIT_RESET_SECONDS:
+                # Half-open: let calls through; the next failure reopens it
+                self.opened_at = None
+                self.failures = CIRCUIT_FAILURE_THRESHOLD - 1
+                return False
+            return True
+
+    def _record(self, operation, seconds, error=False, retries=0, stale=False, transient=False):
+        with self.lock:
+            metric = self.metrics[operation]
+            metric["calls"] += 1
+            metric["errors"] += int(error)
+            metric["retries"] += retries
+            metric["stale"] += int(stale)
+            metric["total_seconds"] += seconds
+            metric["latencies"].append(seconds)
+            if stale or (error and not transient):
+                return
+            if error:
+                self.failures += 1
+                if self.failures >= CIRCUIT_FAILURE_THRESHOLD and self.opened_at is None:
+                    self.opened_at = time.monotonic()
+            else:
+                self.failures = 0
+
+    def _call(self, method, args, kwargs):
+        if method not in self.READ_METHODS:
+            return getattr(self.storage, method)(*args, **kwargs)
+        future = self.executor.submit(getattr(self.storage, method), *args, **kwargs)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The abandoned read keeps running in its worker; its result is simply ignored
+            raise TimeoutError(f"{method} took longer than {self.timeout}s")
+
+    def _run(self, method, *args, **kwargs):
+        operation = f"{method}:{args[0] if args else ''}"
+        read = method in self.READ_METHODS
+        cache_key = (method, repr(args), repr(sorted(kwargs.items())))
+        started = time.perf_counter()
+
+        if self._circuit_open():
+            with self.lock:
+                cached = self.stale.get(cache_key)
+            if read and cached is not None:
+                self._record(operation, time.perf_counter() - started, stale=True)
+                return cached[0]
+            self._record(operation, time.perf_counter() - started, error=True)
+            raise CircuitOpenError("The database is failing; retrying in a few seconds.")
+
+        attempts = STORAGE_READ_RETRIES if read else 1
+        for attempt in range(attempts):
+            try:
+                result = self._call(method, args, kwargs)
+            except Exception as e:
+                transient = isinstance(e, TRANSIENT_STORAGE_ERRORS)
+                # A failed health check already answered the question a retry would ask
+                if not transient or isinstance(e, DatabaseUnreachableError) or attempt + 1 == attempts:
+                    self._record(operation, time.perf_counter() - started, error=True,
+                                 retries=attempt, transient=transient)
+                    raise
+                time.sleep(STORAGE_RETRY_BASE_DELAY * 2 ** attempt * (1 + random.random()))
+                continue
+            self._record(operation, time.perf_counter() - started, retries=attempt)
+            if read:
+                # select(table, columns, filters, order, desc, offset, limit)
+                offset = kwargs.get("offset", args[5] if len(args) > 5 else 0)
+                self._remember(cache_key, result, paged=bool(offset))
+            return result
+
+    def _remember(self, cache_key, result, paged):
+        """Keeps a read result for the open-breaker fallback, within STALE_CACHE_MAX_ROWS in total.
+
+        Later pages of a paged read and results over STALE_CACHE_MAX_RESULT_ROWS are not kept,
+        so exports, snapshot refreshes and index rebuilds do not pin whole tables in memory.
         """
-        st.markdown(favicon_html, unsafe_allow_html=True)
+        rows = len(result) if isinstance(result, list) else 1
+        with self.lock:
+            previous = self.stale.pop(cache_key, None)
+            if previous is not None:
+                self.stale_rows -= previous[1]
+            if paged or rows > STALE_CACHE_MAX_RESULT_ROWS:
+                return
+            self.stale[cache_key] = (result, rows)
+            self.stale_rows += rows
+            while len(self.stale) > STALE_CACHE_SIZE or self.stale_rows > STALE_CACHE_MAX_ROWS:
+                _, (_, evicted_rows) = self.stale.popitem(last=False)
+                self.stale_rows -= evicted_rows
+
+    def metrics_summary(self):
+        """Returns one row per operation with call counts, error counts and latency percentiles in ms."""
+        with self.lock:
+            rows = []
+            for operation, metric in sorted(self.metrics.items()):
+                latencies = np.array(metric["latencies"]) * 1000
+                rows.append({
+                    "operation": operation,
+                    "calls": metric["calls"],
+                    "errors": metric["errors"],
+                    "retries": metric["retries"],
+                    "stale": metric["stale"],
+                    "mean_ms": metric["total_seconds"] * 1000 / metric["calls"],
+                    "p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0
+                })
+            return rows
+
+    def select(self, *args, **kwargs):
+        return self._run("select", *args, **kwargs)
+
+    def table_stats(self, *args, **kwargs):
+        return self._run("table_stats", *args, **kwargs)
+
+    def insert(self, *args, **kwargs):
+        return self._run("insert", *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._run("update", *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._run("delete", *args, **kwargs)
+
+    def upsert(self, *args, **kwargs):
+        return self._run("upsert", *args, **kwargs)
+
+    def increment(self, *args, **kwargs):
+        return self._run("increment", *args, **kwargs)
+
+def create_storage():
+    """Builds the backend named by STORAGE_BACKEND, defaulting to Supabase when it is configured."""
+    backend = get_secret("STORAGE_BACKEND")
+    url = get_secret("SUPABASE_URL")
+    if backend is None:
+        backend = "supabase" if url else "sqlite"
+
+    if backend == "supabase":
+        return HealthCheckedStorage(SupabaseStorage(url, get_secret("SUPABASE_KEY")))
+    if backend == "sqlite":
+        return SQLiteStorage(get_secret("SQLITE_PATH", SQLITE_PATH))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+@st.cache_resource
+def get_storage():
+    """Returns the process-wide storage backend behind the resilience layer."""
+    return ResilientStorage(create_storage())
 
 # Database Setup & Helpers
-def init_db():
-    """Initializes the Supabase database by creating tables and inserting default schedule data."""
-    try:
-        default_phases = {
-            "Phase 1": {
-                "title": "Foundations (Months 1–2)",
-                "focus": "Engineering Mathematics & Discrete Mathematics",
-                "table": [
-                    ["Monday", "7:00-9:00 PM", "Theory Lecture", "Calculus Fundamentals"],
-                    ["Tuesday", "7:00-9:00 PM", "Problem-Solving", "Calculus: Worked examples and derivations"],
-                    ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Linear Algebra Basics: Vector spaces, matrices, operations"],
-                    ["Thursday", "7:00-9:00 PM", "Problem-Solving", "Linear Algebra: Determinants, eigenvalues"],
-                    ["Friday", "7:00-9:00 PM", "Weekly Recap & Quiz", "Combined Topics: Quick tests and self-assessment"],
-                    ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Live lecture reinforcing fundamentals"],
-                    ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "In-depth lecture on Calculus/Linear Algebra"],
-                    ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Exercises and sample problems"],
-                    ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Comprehensive problem sets"],
-                    ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Full-length practice test and error analysis"]
-                ]
-            },
-            "Phase 2": {
-                "title": "Advanced Mathematics & Probability/Statistics (Months 3–4)",
-                "focus": "Advanced Probability & Statistics topics (counting, axioms, distributions, optimization, hypothesis testing) with Go Classes sessions for clarifications.",
-                "table": [
-                    ["Day", "Time Slot", "Activity & Go Classes Integration", "Subject Focus & Details"],
-                    ["Monday", "7:00-9:00 PM", "Theory Lecture", "Counting Techniques & Probability Basics: Permutations, combinations, axioms"],
-                    ["Tuesday", "7:00-9:00 PM", "Problem-Solving", "Probability Concepts: Sample spaces, independence, events"],
-                    ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Random Variables & Distributions: Discrete (Bernoulli, Binomial) and Continuous (Uniform, Exponential)"],
-                    ["Thursday", "7:00-9:00 PM", "Practice & Exercises", "Statistical Inference: Conditional probability, Bayes' theorem"],
-                    ["Friday", "7:00-9:00 PM", "Recap & Quiz", "Review: CLT, confidence intervals, z-test, t-test, chi-squared test"],
-                    ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Session on key problem areas in probability/statistics"],
-                    ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "Advanced Topics: In-depth derivations and optimization techniques"],
-                    ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Practice: Challenging problems and test-style questions"],
-                    ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Combined exercises and review"],
-                    ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Assessment: Timed tests with detailed error analysis"]
-                ]
-            },
-            "Phase 3": {
-                "title": "Programming, Data Structures, Algorithms & Database Management (Months 5–7)",
-                "focus": "Python programming, core data structures and algorithms, and database management fundamentals, with supplementary Go Classes sessions for coding and database concepts.",
-                "table": [
-                    ["Day", "Time Slot", "Activity & Go Classes Integration", "Subject Focus & Details"],
-                    ["Monday", "7:00-9:00 PM", "Theory Lecture", "Python Programming & Basic Data Structures: Syntax, data types, stacks, queues"],
-                    ["Tuesday", "7:00-9:00 PM", "Coding Practice", "Data Structures: Implementation of linked lists, arrays, etc."],
-                    ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Algorithms: Search algorithms (linear, binary) and basic sorting"],
-                    ["Thursday", "7:00-9:00 PM", "Problem-Solving", "Hands-On: Coding exercises on trees, hash tables, etc."],
-                    ["Friday", "7:00-9:00 PM", "Recap & Quiz", "Review: Quick quizzes and conceptual coding reviews"],
-                    ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Live session on coding challenges and database queries"],
-                    ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "Database Management: ER-model, relational algebra, SQL, normalization"],
-                    ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Practice: Hands-on coding and SQL query practices"],
-                    ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Combined coding challenges and algorithm problem sets"],
-                    ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Assessment: Full-length tests with detailed walkthroughs"]
-                ]
-            },
-            "Phase 4": {
-                "title": "Machine Learning & Artificial Intelligence (Months 8–10)",
-                "focus": "Supervised & unsupervised machine learning techniques and AI fundamentals, with interactive Go Classes sessions on advanced ML/AI topics.",
-                "table": [
-                    ["Day", "Time Slot", "Activity & Go Classes Integration", "Subject Focus & Details"],
-                    ["Monday", "7:00-9:00 PM", "Theory Lecture", "Supervised Learning: Regression (simple, multiple, ridge) & Classification (logistic, SVM, etc.)"],
-                    ["Tuesday", "7:00-9:00 PM", "Practical Implementation", "Supervised Learning: Python coding (k-nearest neighbors, decision trees)"],
-                    ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Neural Networks: Fundamentals of MLP and feed-forward architecture"],
-                    ["Thursday", "7:00-9:00 PM", "Coding Practice", "Unsupervised Learning: Clustering (k-means, hierarchical) and PCA implementations"],
-                    ["Friday", "7:00-9:00 PM", "Recap & Quiz", "Review: Bias-variance, cross-validation, and key ML/AI concepts"],
-                    ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Interactive session on ML/AI problem solving"],
-                    ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "Artificial Intelligence: Search strategies, logic, reasoning under uncertainty"],
-                    ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Practice: Case studies and sample problems on ML/AI algorithms"],
-                    ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Mixed Topics: Comprehensive exercises integrating ML/AI concepts"],
-                    ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Assessment: Full-length mock tests with in-depth error analysis"]
-                ]
-            },
-            "Phase 5": {
-                "title": "Revision, Practice & Mock Tests (Months 11–12)",
-                "focus": "Comprehensive revision of all subjects with intensive practice, mock tests, and error analysis. Final Go Classes sessions polish exam strategies.",
-                "table": [
-                    ["Day", "Time Slot", "Activity & Go Classes Integration", "Subject Focus & Details"],
-                    ["Monday", "7:00-9:00 PM", "Revision Session", "Quick review of Calculus, Linear Algebra, Discrete Math"],
-                    ["Tuesday", "7:00-9:00 PM", "Revision & Practice", "Probability & Statistics: Key formulas and targeted problems"],
-                    ["Wednesday", "7:00-9:00 PM", "Revision Session", "Programming & Algorithms: Code review and challenging problem solving"],
-                    ["Thursday", "7:00-9:00 PM", "Revision & Practice", "Database Management: SQL queries, normalization, ER-model refresh"],
-                    ["Friday", "7:00-9:00 PM", "Mixed Revision & Quiz", "Machine Learning & AI: Quick quizzes and concept reviews"],
-                    ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Final review and strategy session"],
-                    ["Saturday", "10:00 AM-12:00 PM", "Full-Length Mock Test", "Simulated exam covering the entire syllabus"],
-                    ["Saturday", "1:00-4:00 PM", "Error Analysis & Revision", "Detailed review of mistakes and focus on weak areas"],
-                    ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Combined problem sets for speed and accuracy"],
-                    ["Sunday", "1:00-5:00 PM", "Final Revision & Strategy", "Overall preparation: Strategy session, key summaries, and Q&A review"]
-                ]
-            },
-            "General Aptitude": {
-                "title": "General Aptitude",
-                "focus": "Quantitative, Logical, and Verbal skills",
-                "table": [
-                    ["Monday", "5:00-6:00 PM", "Practice", "Quantitative problems"],
-                    ["Wednesday", "5:00-6:00 PM", "Practice", "Logical reasoning puzzles"],
-                    ["Friday", "5:00-6:00 PM", "Practice", "Verbal ability and reading comprehension"]
-                ]
-            }
-        }
+# Bump when DEFAULT_SCHEDULES changes so existing databases pick up new phases
+SEED_VERSION = "2"
+# Progress log dates are stored as ISO strings; older dashboards wrote m/d/Y
+LOG_DATE_FORMAT = "iso"
+LOG_DATE_MIGRATION_BATCH_SIZE = 500
+SCHEDULE_COLUMNS = ["day", "time_slot", "activity", "details"]
+
+DEFAULT_SCHEDULES = {
+    "Phase 1": {
+        "title": "Foundations (Months 1–2)",
+        "focus": "Engineering Mathematics & Discrete Mathematics",
+        "table": [
+            ["Monday", "7:00-9:00 PM", "Theory Lecture", "Calculus Fundamentals"],
+            ["Tuesday", "7:00-9:00 PM", "Problem-Solving", "Calculus: Worked examples and derivations"],
+            ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Linear Algebra Basics: Vector spaces, matrices, operations"],
+            ["Thursday", "7:00-9:00 PM", "Problem-Solving", "Linear Algebra: Determinants, eigenvalues"],
+            ["Friday", "7:00-9:00 PM", "Weekly Recap & Quiz", "Combined Topics: Quick tests and self-assessment"],
+            ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Live lecture reinforcing fundamentals"],
+            ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "In-depth lecture on Calculus/Linear Algebra"],
+            ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Exercises and sample problems"],
+            ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Comprehensive problem sets"],
+            ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Full-length practice test and error analysis"]
+        ]
+    },
+    "Phase 2": {
+        "title": "Advanced Mathematics & Probability/Statistics (Months 3–4)",
+        "focus": "Advanced Probability & Statistics topics (counting, axioms, distributions, optimization, hypothesis testing) with Go Classes sessions for clarifications.",
+        "table": [
+            ["Monday", "7:00-9:00 PM", "Theory Lecture", "Counting Techniques & Probability Basics: Permutations, combinations, axioms"],
+            ["Tuesday", "7:00-9:00 PM", "Problem-Solving", "Probability Concepts: Sample spaces, independence, events"],
+            ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Random Variables & Distributions: Discrete (Bernoulli, Binomial) and Continuous (Uniform, Exponential)"],
+            ["Thursday", "7:00-9:00 PM", "Practice & Exercises", "Statistical Inference: Conditional probability, Bayes' theorem"],
+            ["Friday", "7:00-9:00 PM", "Recap & Quiz", "Review: CLT, confidence intervals, z-test, t-test, chi-squared test"],
+            ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Session on key problem areas in probability/statistics"],
+            ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "Advanced Topics: In-depth derivations and optimization techniques"],
+            ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Practice: Challenging problems and test-style questions"],
+            ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Combined exercises and review"],
+            ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Assessment: Timed tests with detailed error analysis"]
+        ]
+    },
+    "Phase 3": {
+        "title": "Programming, Data Structures, Algorithms & Database Management (Months 5–7)",
+        "focus": "Python programming, core data structures and algorithms, and database management fundamentals, with supplementary Go Classes sessions for coding and database concepts.",
+        "table": [
+            ["Monday", "7:00-9:00 PM", "Theory Lecture", "Python Programming & Basic Data Structures: Syntax, data types, stacks, queues"],
+            ["Tuesday", "7:00-9:00 PM", "Coding Practice", "Data Structures: Implementation of linked lists, arrays, etc."],
+            ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Algorithms: Search algorithms (linear, binary) and basic sorting"],
+            ["Thursday", "7:00-9:00 PM", "Problem-Solving", "Hands-On: Coding exercises on trees, hash tables, etc."],
+            ["Friday", "7:00-9:00 PM", "Recap & Quiz", "Review: Quick quizzes and conceptual coding reviews"],
+            ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Live session on coding challenges and database queries"],
+            ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "Database Management: ER-model, relational algebra, SQL, normalization"],
+            ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Practice: Hands-on coding and SQL query practices"],
+            ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Combined coding challenges and algorithm problem sets"],
+            ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Assessment: Full-length tests with detailed walkthroughs"]
+        ]
+    },
+    "Phase 4": {
+        "title": "Machine Learning & Artificial Intelligence (Months 8–10)",
+        "focus": "Supervised & unsupervised machine learning techniques and AI fundamentals, with interactive Go Classes sessions on advanced ML/AI topics.",
+        "table": [
+            ["Monday", "7:00-9:00 PM", "Theory Lecture", "Supervised Learning: Regression (simple, multiple, ridge) & Classification (logistic, SVM, etc.)"],
+            ["Tuesday", "7:00-9:00 PM", "Practical Implementation", "Supervised Learning: Python coding (k-nearest neighbors, decision trees)"],
+            ["Wednesday", "7:00-9:00 PM", "Theory Lecture", "Neural Networks: Fundamentals of MLP and feed-forward architecture"],
+            ["Thursday", "7:00-9:00 PM", "Coding Practice", "Unsupervised Learning: Clustering (k-means, hierarchical) and PCA implementations"],
+            ["Friday", "7:00-9:00 PM", "Recap & Quiz", "Review: Bias-variance, cross-validation, and key ML/AI concepts"],
+            ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Interactive session on ML/AI problem solving"],
+            ["Saturday", "10:00 AM-12:00 PM", "Deep Study Session", "Artificial Intelligence: Search strategies, logic, reasoning under uncertainty"],
+            ["Saturday", "1:00-4:00 PM", "Intensive Problem Solving", "Practice: Case studies and sample problems on ML/AI algorithms"],
+            ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Mixed Topics: Comprehensive exercises integrating ML/AI concepts"],
+            ["Sunday", "1:00-5:00 PM", "Mock Test & Revision", "Assessment: Full-length mock tests with in-depth error analysis"]
+        ]
+    },
+    "Phase 5": {
+        "title": "Revision, Practice & Mock Tests (Months 11–12)",
+        "focus": "Comprehensive revision of all subjects with intensive practice, mock tests, and error analysis. Final Go Classes sessions polish exam strategies.",
+        "table": [
+            ["Monday", "7:00-9:00 PM", "Revision Session", "Quick review of Calculus, Linear Algebra, Discrete Math"],
+            ["Tuesday", "7:00-9:00 PM", "Revision & Practice", "Probability & Statistics: Key formulas and targeted problems"],
+            ["Wednesday", "7:00-9:00 PM", "Revision Session", "Programming & Algorithms: Code review and challenging problem solving"],
+            ["Thursday", "7:00-9:00 PM", "Revision & Practice", "Database Management: SQL queries, normalization, ER-model refresh"],
+            ["Friday", "7:00-9:00 PM", "Mixed Revision & Quiz", "Machine Learning & AI: Quick quizzes and concept reviews"],
+            ["Saturday", "9:00-10:00 AM", "Go Classes Live Session", "Final review and strategy session"],
+            ["Saturday", "10:00 AM-12:00 PM", "Full-Length Mock Test", "Simulated exam covering the entire syllabus"],
+            ["Saturday", "1:00-4:00 PM", "Error Analysis & Revision", "Detailed review of mistakes and focus on weak areas"],
+            ["Sunday", "9:00-12:00 PM", "Integrated Practice", "Combined problem sets for speed and accuracy"],
+            ["Sunday", "1:00-5:00 PM", "Final Revision & Strategy", "Overall preparation: Strategy session, key summaries, and Q&A review"]
+        ]
+    },
+    "General Aptitude": {
+        "title": "General Aptitude",
+        "focus": "Quantitative, Logical, and Verbal skills",
+        "table": [
+            ["Monday", "5:00-6:00 PM", "Practice", "Quantitative problems"],
+            ["Wednesday", "5:00-6:00 PM", "Practice", "Logical reasoning puzzles"],
+            ["Friday", "5:00-6:00 PM", "Practice", "Verbal ability and reading comprehension"]
+        ]
+    }
+}
 
-        # Insert default phases if they don't exist
-        for phase, details in default_phases.items():
-            existing = supabase.table("schedule").select("*").eq("phase", phase).execute()
+def init_db(force=False):
+    """Seeds the default schedules in one bulk upsert unless the seed version marker says it is done.
 
-            if not existing.data:  # If phase doesn't exist, insert it
-                response = supabase.table("schedule").insert({
-                    "phase": phase,
-                    "title": details["title"],
-                    "focus": details["focus"],
-                    "schedule_json": json.dumps(details["table"])
-                }).execute()
+    Returns True when the seed step ran. Existing phases are never overwritten. Errors
+    propagate, so initialize_app does not cache a failed seed.
+    """
+    storage = get_storage()
+    marker = storage.select("app_meta", filters={"key": "seed_version"})
+    if not force and marker and marker[0]["value"] == SEED_VERSION:
+        return False
 
-                if not hasattr(response, 'data'):
-                    st.error(f"Error inserting phase {phase}")
+    storage.upsert("schedule", [
+        {"phase": phase, "title": details["title"], "focus": details["focus"]}
+        for phase, details in DEFAULT_SCHEDULES.items()
+    ], on_conflict="phase", ignore_duplicates=True)
+
+    # Phases without slots get them from their legacy schedule_json, else from the defaults
+    phases_with_slots = {row["phase"] for row in storage.select("schedule_slots", columns="phase")}
+    slots = []
+    for row in storage.select("schedule"):
+        if row["phase"] in phases_with_slots:
+            continue
+        if row.get("schedule_json"):
+            table = json.loads(row["schedule_json"])
+        else:
+            table = DEFAULT_SCHEDULES.get(row["phase"], {}).get("table", [])
+        slots += schedule_slot_rows(row["phase"], enumerate(drop_header_rows(table)))
+    if slots:
+        storage.upsert("schedule_slots", slots, on_conflict="phase,position", ignore_duplicates=True)
 
-    except Exception as e:
-        st.error(f"Error initializing database: {str(e)}")
+    storage.upsert("app_meta", {"key": "seed_version", "value": SEED_VERSION}, on_conflict="key")
+    bump_schedule_version()
+    return True
+
+def migrate_log_dates():
+    """Rewrites progress log dates stored in any other format as ISO dates, once per database.
+
+    Returns True when the migration ran.
+    """
+    storage = get_storage()
+    marker = storage.select("app_meta", filters={"key": "log_date_format"})
+    if marker and marker[0]["value"] == LOG_DATE_FORMAT:
+        return False
+
+    df = pd.DataFrame(fetch_table_rows("progress_logs", "id,date"), columns=["id", "date"])
+    df["iso"] = pd.to_datetime(df["date"], format="mixed").dt.strftime("%Y-%m-%d")
+    changed = df[df["iso"] != df["date"]]
+    for iso_date, ids in changed.groupby("iso")["id"]:
+        ids = ids.tolist()
+        for start in range(0, len(ids), LOG_DATE_MIGRATION_BATCH_SIZE):
+            storage.update(
+                "progress_logs", {"date": iso_date},
+                {"id": ids[start:start + LOG_DATE_MIGRATION_BATCH_SIZE]}
+            )
+
+    storage.upsert("app_meta", {"key": "log_date_format", "value": LOG_DATE_FORMAT}, on_conflict="key")
+    invalidate_snapshot("progress_logs")
+    return True
 
 def insert_progress_log(date_str, phase, subject, hours, notes):
-    """Inserts a new progress log."""
+    """Inserts a new progress log; the date is stored as an ISO string whatever form it arrives in."""
     try:
         data = {
-            'date': date_str,
+            'date': pd.to_datetime(date_str).date().isoformat(),
             'phase': phase,
             'subject': subject,
             'hours': float(hours),
             'notes': notes
         }
 
-        response = supabase.table('progress_logs').insert(data).execute()
-
-        if isinstance(response.data, list) and len(response.data) > 0:
+        inserted = get_storage().insert('progress_logs', data)
+
+        if inserted:
+            invalidate_snapshot("progress_logs")
+            tracked = get_storage().select("study_goals", filters={"auto_track": 1})
+            matched = [goal for goal in tracked if goal_matches_log(goal, data)]
+            if not update_goals_achievement({goal["id"]: data["hours"] for goal in matched}):
+                st.error(
+                    "The session was logged, but these tracking goals were not updated: "
+                    + ", ".join(goal["description"] for goal in matched)
+                    + ". Add the hours to them on the Study Goals page."
+                )
+                return False
             return True
         return False
 
@@ -271,27 +981,78 @@ def insert_progress_log(date_str, phase, subject, hours, notes):
         st.error(f"Error inserting progress log: {str(e)}")
         return False
 
-def update_schedule_db(phase, new_table):
-    data = {"schedule_json": json.dumps(new_table)}
-    result = supabase.table("schedule").update(data).eq("phase", phase).execute()
-    if result.error:
-        st.error(f"Error updating schedule: {result.error}")
+def drop_header_rows(table):
+    """Removes "Day | Time Slot | ..." header rows that older schedules stored as data."""
+    return [row for row in table if not (row and str(row[0]).strip().lower() == "day")]
 
-def get_all_schedules():
-    """Retrieves all schedules from the Supabase database"""
+def schedule_slot_rows(phase, numbered_rows):
+    """Turns (position, [day, time_slot, activity, details]) pairs into schedule_slots rows."""
+    return [
+        {"phase": phase, "position": int(position),
+         **{column: ("" if value is None else str(value)) for column, value in zip(SCHEDULE_COLUMNS, row)}}
+        for position, row in numbered_rows
+    ]
+
+def diff_schedule_rows(original, edited):
+    """Compares two versions of a phase table by position.
+
+    Returns (changed, removed): (position, row) pairs to upsert and positions past the new end.
+    """
+    changed = [
+        (position, row) for position, row in enumerate(edited)
+        if position >= len(original) or list(original[position]) != list(row)
+    ]
+    return changed, list(range(len(edited), len(original)))
+
+def bump_schedule_version():
+    """Marks the cached parsed schedules and their snapshots as stale for every session."""
+    invalidate_snapshot("schedule")
+    invalidate_snapshot("schedule_slots")
+    get_storage().upsert(
+        "app_meta", {"key": "schedule_version", "value": str(time.time_ns())}, on_conflict="key"
+    )
+
+def update_schedule_db(phase, original_table, new_table):
+    """Saves only the slots that differ between the loaded and edited phase table."""
     try:
-        response = supabase.table('schedule').select('*').execute()
+        changed, removed = diff_schedule_rows(original_table, new_table)
+        if not changed and not removed:
+            return True
+        storage = get_storage()
+        if changed:
+            storage.upsert("schedule_slots", schedule_slot_rows(phase, changed), on_conflict="phase,position")
+        if removed:
+            storage.delete("schedule_slots", {"phase": phase, "position": removed})
+        bump_schedule_version()
+        return True
+    except Exception as e:
+        st.error(f"Error updating schedule: {str(e)}")
+        return False
 
-        schedules = {}
+@st.cache_data(show_spinner=False)
+def load_schedules(version):
+    """Loads and assembles every phase's slots; version only keys the cache."""
+    schedules = {
+        row['phase']: {'title': row['title'], 'focus': row['focus'], 'table': []}
+        for row in load_table_records('schedule')
+    }
+    for slot in sorted(load_table_records('schedule_slots'), key=lambda slot: slot['position']):
+        if slot['phase'] in schedules:
+            schedules[slot['phase']]['table'].append([slot[column] for column in SCHEDULE_COLUMNS])
+    return schedules
 
-        if hasattr(response, 'data') and response.data:
-            for row in response.data:
-                schedules[row['phase']] = {
-                    'title': row['title'],
-                    'focus': row['focus'],
-                    'table': json.loads(row['schedule_json']) if row['schedule_json'] else []
-                }
-        return schedules
+def get_schedule_version():
+    try:
+        marker = get_storage().select("app_meta", filters={"key": "schedule_version"})
+    except TRANSIENT_STORAGE_ERRORS:
+        # Offline: key the caches by snapshot age so load_schedules serves the saved snapshots
+        return f"offline-{int(time.time() // SNAPSHOT_MAX_AGE_SECONDS)}"
+    return marker[0]["value"] if marker else ""
+
+def get_all_schedules():
+    """Retrieves all schedules, reparsing them only after a schedule edit."""
+    try:
+        return load_schedules(get_schedule_version())
     except Exception as e:
         st.error(f"Error fetching schedules: {str(e)}")
         return {}
@@ -299,11 +1060,9 @@ def get_all_schedules():
 def get_progress_logs():
     """Retrieves all progress logs."""
     try:
-        response = supabase.table('progress_logs').select(
-            'id,date,phase,subject,hours,notes'
-        ).order('date', desc=True).execute()
-
-        return response.data if hasattr(response, 'data') else []
+        return get_storage().select(
+            'progress_logs', 'id,date,phase,subject,hours,notes', order='date', desc=True
+        )
     except Exception as e:
         st.error(f"Error fetching progress logs: {str(e)}")
         return []
@@ -316,8 +1075,13 @@ def insert_question(subject, question, answer):
             "question": question,
             "answer": answer
         }
-        response = supabase.table("question_bank").insert(data).execute()
-        return hasattr(response, 'data') and response.data
+        inserted = get_storage().insert("question_bank", data)
+        invalidate_snapshot("question_bank")
+        get_question_index().add(inserted)
+        for row in inserted:
+            get_duplicate_index().add(row["id"], row["question"])
+        add_review_items("question", [row["id"] for row in inserted])
+        return bool(inserted)
     except Exception as e:
         st.error(f"Error inserting question: {str(e)}")
         return False
@@ -325,32 +1089,98 @@ def insert_question(subject, question, answer):
 def get_all_questions():
     """Retrieves all questions from the question bank."""
     try:
-        response = supabase.table("question_bank").select("*").execute()
-        return response.data if hasattr(response, 'data') else []
+        return load_table_records("question_bank")
+    except Exception as e:
+        st.error(f"Error fetching questions: {str(e)}")
+        return []
+
+def get_question_page(question_ids):
+    """Retrieves the given questions, in the order of question_ids."""
+    try:
+        by_id = {}
+        for start in range(0, len(question_ids), QUESTION_FETCH_BATCH_SIZE):
+            batch = list(question_ids[start:start + QUESTION_FETCH_BATCH_SIZE])
+            for row in get_storage().select("question_bank", filters={"id": batch}):
+                by_id[row["id"]] = row
+        return [by_id[qid] for qid in question_ids if qid in by_id]
     except Exception as e:
         st.error(f"Error fetching questions: {str(e)}")
         return []
 
-def insert_resource(subject, title, link, filename=None):
+def delete_questions(question_ids):
+    """Deletes several questions from the question bank in one request."""
+    try:
+        deleted = get_storage().delete("question_bank", {"id": list(question_ids)})
+        get_storage().delete("review_state", {"item_type": "question", "item_id": list(question_ids)})
+        invalidate_snapshot("question_bank")
+        for question_id in question_ids:
+            get_question_index().remove(question_id)
+            get_duplicate_index().remove(question_id)
+        return bool(deleted)
+    except Exception as e:
+        st.error(f"Error deleting questions: {str(e)}")
+        return False
+
+def delete_question(question_id):
+    """Deletes a question from the question bank."""
+    return delete_questions([question_id])
+
+def insert_resource(subject, title, link, filename=None, blob_hash=None, original_name=None):
     """Inserts a new resource into the database."""
     try:
         data = {
             "subject": subject,
             "title": title,
             "link": link,
-            "filename": filename
+            "filename": filename,
+            "blob_hash": blob_hash,
+            "original_name": original_name
         }
-        response = supabase.table("resources").insert(data).execute()
-        return hasattr(response, 'data') and response.data
+        inserted = get_storage().insert("resources", data)
+        invalidate_snapshot("resources")
+        return bool(inserted)
     except Exception as e:
         st.error(f"Error inserting resource: {str(e)}")
         return False
 
+def save_file_resource(upload_key, subject, title, filename, blob_hash, original_name):
+    """Registers an upload as a new resource; saving the same upload again updates that resource's subject and title.
+
+    Resources are tracked per upload (in st.session_state.saved_uploads), not per content hash, so
+    other resources holding the same file are never touched.
+    """
+    try:
+        storage = get_storage()
+        saved = st.session_state.setdefault("saved_uploads", {})
+        if upload_key in saved:
+            updated = storage.update("resources", {"subject": subject, "title": title}, {"id": saved[upload_key]})
+            invalidate_snapshot("resources")
+            if updated:
+                return True
+        inserted = storage.insert("resources", {
+            "subject": subject,
+            "title": title,
+            "link": "",
+            "filename": filename,
+            "blob_hash": blob_hash,
+            "original_name": original_name
+        })
+        invalidate_snapshot("resources")
+        if inserted:
+            saved[upload_key] = inserted[0]["id"]
+        return bool(inserted)
+    except Exception as e:
+        st.error(f"Error saving resource: {str(e)}")
+        return False
+
 def delete_resource(resource_id):
     """Deletes a resource from the database."""
     try:
-        response = supabase.table("resources").delete().eq('id', resource_id).execute()
-        return hasattr(response, 'data') and response.data
+        deleted = get_storage().delete("resources", {"id": resource_id})
+        invalidate_snapshot("resources")
+        for row in deleted:
+            release_upload(row.get("filename"))
+        return bool(deleted)
     except Exception as e:
         st.error(f"Error deleting resource: {str(e)}")
         return False
@@ -358,22 +1188,50 @@ def delete_resource(resource_id):
 def get_all_resources():
     """Retrieves all resources from the database."""
     try:
-        response = supabase.table("resources").select("*").execute()
-        return response.data if hasattr(response, 'data') else []
+        return load_table_records("resources")
     except Exception as e:
         st.error(f"Error fetching resources: {str(e)}")
         return []
 
-def insert_study_goal(description, target_hours, achieved_hours=0):
-    """Inserts a new study goal into the database."""
+def goal_matches_log(goal, log):
+    """True when a goal's subject, phase and date range (each optional) all cover a progress log."""
+    if goal.get("subject") and goal["subject"] != log["subject"]:
+        return False
+    if goal.get("phase") and goal["phase"] != log["phase"]:
+        return False
+    if goal.get("start_date") or goal.get("end_date"):
+        log_date = pd.to_datetime(log["date"]).date().isoformat()
+        if goal.get("start_date") and log_date < goal["start_date"]:
+            return False
+        if goal.get("end_date") and log_date > goal["end_date"]:
+            return False
+    return True
+
+def logged_hours_for_goal(goal):
+    """Sums the logged hours a new tracking goal covers, so it starts from the existing history."""
+    filters = {column: goal[column] for column in ("subject", "phase") if goal.get(column)}
+    logs = fetch_table_rows("progress_logs", "date,phase,subject,hours", filters=filters)
+    return sum(float(log["hours"]) for log in logs if goal_matches_log(goal, log))
+
+def insert_study_goal(description, target_hours, achieved_hours=0, auto_track=False,
+                      subject=None, phase=None, start_date=None, end_date=None):
+    """Inserts a new study goal; tracking goals then follow matching progress logs automatically."""
     try:
         data = {
             "description": description,
             "target_hours": float(target_hours),
-            "achieved_hours": float(achieved_hours)
+            "achieved_hours": float(achieved_hours),
+            "auto_track": int(auto_track),
+            "subject": subject,
+            "phase": phase,
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None
         }
-        response = supabase.table("study_goals").insert(data).execute()
-        return hasattr(response, 'data') and response.data
+        if auto_track:
+            data["achieved_hours"] += logged_hours_for_goal(data)
+        inserted = get_storage().insert("study_goals", data)
+        invalidate_snapshot("study_goals")
+        return bool(inserted)
     except Exception as e:
         st.error(f"Error inserting study goal: {str(e)}")
         return False
@@ -381,50 +1239,53 @@ def insert_study_goal(description, target_hours, achieved_hours=0):
 def get_study_goals():
     """Retrieves all study goals from the database."""
     try:
-        response = supabase.table("study_goals").select("*").execute()
-        return response.data if hasattr(response, 'data') else []
+        return load_table_records("study_goals")
     except Exception as e:
         st.error(f"Error fetching study goals: {str(e)}")
         return []
 
-def update_goal_achievement(goal_id, additional_hours):
-    """Updates the achieved hours for a study goal."""
+def update_goals_achievement(hours_by_goal):
+    """Atomically adds hours to several study goals, given as {goal_id: additional_hours}."""
     try:
-        response = supabase.table("study_goals").select("*").eq('id', goal_id).execute()
-        if hasattr(response, 'data') and response.data:
-            current_goal = response.data[0]
-            new_achieved = float(current_goal['achieved_hours']) + float(additional_hours)
-
-            update_response = supabase.table("study_goals").update(
-                {"achieved_hours": new_achieved}
-            ).eq('id', goal_id).execute()
-
-            return hasattr(update_response, 'data') and update_response.data
-        return False
+        if not hours_by_goal:
+            return True
+        updated = get_storage().increment(
+            "study_goals", "achieved_hours",
+            {goal_id: float(hours) for goal_id, hours in hours_by_goal.items()}
+        )
+        invalidate_snapshot("study_goals")
+        return bool(updated)
     except Exception as e:
         st.error(f"Error updating goal achievement: {str(e)}")
         return False
 
+def update_goal_achievement(goal_id, additional_hours):
+    """Updates the achieved hours for a study goal."""
+    return update_goals_achievement({goal_id: additional_hours})
+
 def delete_study_goal(goal_id):
     """Deletes a study goal from the database."""
     try:
-        response = supabase.table("study_goals").delete().eq('id', goal_id).execute()
-        return hasattr(response, 'data') and response.data
+        deleted = get_storage().delete("study_goals", {"id": goal_id})
+        invalidate_snapshot("study_goals")
+        return bool(deleted)
     except Exception as e:
         st.error(f"Error deleting study goal: {str(e)}")
         return False
 
 def insert_revision_note(subject, short_notes, formula):
     data = {"subject": subject, "short_notes": short_notes, "formula": formula}
-    result = supabase.table("revision_notes").insert(data).execute()
-    if result.error:
-        st.error(f"Error inserting revision note: {result.error}")
+    try:
+        inserted = get_storage().insert("revision_notes", data)
+        invalidate_snapshot("revision_notes")
+        add_review_items("note", [row["id"] for row in inserted])
+    except Exception as e:
+        st.error(f"Error inserting revision note: {str(e)}")
 
 def get_revision_notes():
     """Retrieves all revision notes from the database."""
     try:
-        response = supabase.table("revision_notes").select("*").execute()
-        return response.data if hasattr(response, 'data') else []
+        return load_table_records("revision_notes")
     except Exception as e:
         st.error(f"Error fetching revision notes: {str(e)}")
         return []
@@ -432,12 +1293,494 @@ def get_revision_notes():
 def get_progress_logs_for_report():
     """Retrieves all progress logs with additional analytics for reporting."""
     try:
-        response = supabase.table('progress_logs').select('*').order('date', ascending=False).execute()
-        return response.data if hasattr(response, 'data') else []
+        return get_storage().select('progress_logs', order='date', desc=True)
     except Exception as e:
         st.error(f"Error fetching progress logs: {str(e)}")
         return []
 
+EXPORT_CHUNK_SIZE = 1000
+PROGRESS_LOG_DTYPES = {
+    "date": "string",
+    "subject": "string",
+    "phase": "string",
+    "hours": "float64",
+    "notes": "string"
+}
+QUESTION_DTYPES = {
+    "subject": "string",
+    "question": "string",
+    "answer": "string"
+}
+
+def iter_table_chunks(table_name, dtypes, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields the dtypes columns of a table as DataFrames of at most chunk_size rows, paging by id."""
+    columns = list(dtypes)
+    start = 0
+    while True:
+        rows = get_storage().select(
+            table_name, ",".join(columns), order='id', offset=start, limit=chunk_size
+        )
+        if not rows:
+            return
+        yield pd.DataFrame(rows, columns=columns).astype(dtypes)
+
+        if len(rows) < chunk_size:
+            return
+        start += chunk_size
+
+def iter_progress_log_chunks(chunk_size=EXPORT_CHUNK_SIZE):
+    return iter_table_chunks('progress_logs', PROGRESS_LOG_DTYPES, chunk_size)
+
+def get_progress_logs_version():
+    """Returns a fingerprint of progress_logs that changes whenever rows are added or removed."""
+    try:
+        count, latest_id = get_storage().table_stats('progress_logs')
+        return f"{count}-{latest_id or 0}"
+    except Exception as e:
+        st.error(f"Error checking progress logs: {str(e)}")
+        return None
+
+# Schedule Index
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+WEEKDAY_NUMBERS = {day.lower(): number for number, day in enumerate(WEEKDAYS)}
+CLOCK_PATTERN = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([AaPp][Mm])?")
+
+def clock_minutes(match, meridiem):
+    hour = int(match.group(1))
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.upper() == "PM" else 0)
+    return hour * 60 + int(match.group(2) or 0)
+
+def parse_time_slot(time_slot):
+    """Parses free text such as "7:00-9:00 PM" or "10:00 AM-12:00 PM" into (start, end) minutes after midnight.
+
+    A start without AM/PM takes the end's, unless that would put it after the end ("9:00-12:00 PM").
+    Returns None when the text is not a time range.
+    """
+    parts = re.split(r"\s*[-–]\s*", str(time_slot).strip())
+    if len(parts) != 2:
+        return None
+    start_match = CLOCK_PATTERN.fullmatch(parts[0])
+    end_match = CLOCK_PATTERN.fullmatch(parts[1])
+    if not start_match or not end_match:
+        return None
+
+    end_meridiem = end_match.group(3)
+    end = clock_minutes(end_match, end_meridiem)
+    start = clock_minutes(start_match, start_match.group(3) or end_meridiem)
+    if not start_match.group(3) and end_meridiem and start > end:
+        start = clock_minutes(start_match, "AM")
+    return (start, end) if start < end else None
+
+def build_schedule_index(schedules):
+    """Maps (phase, weekday number) to that day's slots sorted by start; rows without a day or time range are skipped."""
+    index = defaultdict(list)
+    for phase, info in schedules.items():
+        for row in info["table"]:
+            day, time_slot, activity, details = (list(row) + [""] * 4)[:4]
+            weekday = WEEKDAY_NUMBERS.get(str(day).strip().lower())
+            minutes = parse_time_slot(time_slot)
+            if weekday is None or minutes is None:
+                continue
+            index[(phase, weekday)].append({
+                "start": minutes[0],
+                "end": minutes[1],
+                "time_slot": time_slot,
+                "activity": activity,
+                "details": details
+            })
+    for slots in index.values():
+        slots.sort(key=lambda slot: slot["start"])
+    return dict(index)
+
+@st.cache_data(show_spinner=False)
+def load_schedule_index(version):
+    """Builds the slot index for a schedule version; version only keys the cache."""
+    return build_schedule_index(load_schedules(version))
+
+def get_schedule_index():
+    """Returns the (phase, weekday) slot index, rebuilding it only after a schedule edit."""
+    try:
+        return load_schedule_index(get_schedule_version())
+    except Exception as e:
+        st.error(f"Error indexing schedules: {str(e)}")
+        return {}
+
+def planned_hours(index, phase, weekday):
+    return sum(slot["end"] - slot["start"] for slot in index.get((phase, weekday), [])) / 60
+
+def find_current_and_next(index, phase, now):
+    """Returns (slot running at now or None, (days ahead, next slot) or None) for a phase."""
+    minute = now.hour * 60 + now.minute
+    weekday = now.weekday()
+    today = index.get((phase, weekday), [])
+    current = next((slot for slot in today if slot["start"] <= minute < slot["end"]), None)
+    for days_ahead in range(8):
+        for slot in index.get((phase, (weekday + days_ahead) % 7), []):
+            if days_ahead > 0 or slot["start"] > minute:
+                return current, (days_ahead, slot)
+    return current, None
+
+def format_minutes(minutes):
+    return datetime.time(minutes // 60 % 24, minutes % 60).strftime("%I:%M %p").lstrip("0")
+
+def render_schedule_today(phase_options):
+    """Shows the session running now, the next one, and this week's planned vs logged hours."""
+    index = get_schedule_index()
+    df_logs = load_table_frame('progress_logs')
+
+    dates = pd.to_datetime(df_logs['date']) if len(df_logs) > 0 else None
+    default_phase = 0
+    if dates is not None:
+        latest_phase = df_logs['phase'].iloc[dates.argmax()]
+        if latest_phase in phase_options:
+            default_phase = phase_options.index(latest_phase)
+    phase = st.selectbox("Current Phase", phase_options, index=default_phase, key="dashboard_phase")
+
+    now = datetime.datetime.now()
+    current, upcoming = find_current_and_next(index, phase, now)
+    col1, col2 = st.columns(2)
+    with col1:
+        if current:
+            st.metric("Now", current["activity"], f"until {format_minutes(current['end'])}")
+            st.caption(current["details"])
+        else:
+            st.metric("Now", "Free time")
+    with col2:
+        if upcoming:
+            days_ahead, slot = upcoming
+            when = "Today" if days_ahead == 0 else ("Tomorrow" if days_ahead == 1
+                                                    else WEEKDAYS[(now.weekday() + days_ahead) % 7])
+            st.metric("Next", slot["activity"], f"{when} {format_minutes(slot['start'])}")
+            st.caption(slot["details"])
+        else:
+            st.metric("Next", "Nothing scheduled")
+
+    week_start = now.date() - datetime.timedelta(days=now.weekday())
+    logged = [0.0] * 7
+    if dates is not None:
+        in_week = ((df_logs['phase'] == phase) & (dates.dt.date >= week_start)
+                   & (dates.dt.date < week_start + datetime.timedelta(days=7)))
+        by_weekday = df_logs['hours'][in_week].groupby(dates[in_week].dt.weekday).sum()
+        for weekday, hours in by_weekday.items():
+            logged[weekday] = float(hours)
+
+    df_week = pd.DataFrame({
+        "Weekday": WEEKDAYS * 2,
+        "Hours": [planned_hours(index, phase, weekday) for weekday in range(7)] + logged,
+        "Type": ["Planned"] * 7 + ["Logged"] * 7
+    })
+    fig = px.bar(df_week, x="Weekday", y="Hours", color="Type", barmode="group",
+                 title=f"This Week: Planned vs Logged Hours ({phase})")
+    st.plotly_chart(fig, use_container_width=True, key='dashboard_week_plan')
+
+# Plan Adherence
+UNASSIGNED_SUBJECT = "Unassigned"
+# Extra phrases that tie a schedule slot to a subject, on top of the subject's own name
+SUBJECT_KEYWORDS = {
+    "Probability": ["statistic", "random variable", "distribution", "hypothesis", "bayes"],
+    "Discrete Mathematics": ["discrete", "combinatorics", "graph theory"],
+    "Programming & Data Structures": ["python", "programming", "data structure"],
+    "Algorithms": ["algorithm", "sorting", "dynamic programming"],
+    "Database Management": ["database", "sql", "dbms"],
+    "Machine Learning": ["regression", "classification", "clustering"],
+    "Artificial Intelligence": [" ai ", "reasoning under uncertainty"],
+    "General Aptitude": ["aptitude", "quantitative", "verbal"]
+}
+
+def slot_subjects(slot):
+    """Returns the subjects a schedule slot mentions in its activity or details."""
+    text = f" {slot['activity']} {slot['details']} ".lower()
+    return [
+        subject for subject in SUBJECT_LIST
+        if subject.lower() in text or any(keyword in text for keyword in SUBJECT_KEYWORDS.get(subject, []))
+    ]
+
+def build_planned_hours(index):
+    """Expands the slot index into planned hours per (phase, weekday, subject).
+
+    A slot naming several subjects splits its time evenly; one naming none counts as UNASSIGNED_SUBJECT.
+    """
+    rows = []
+    for (phase, weekday), slots in index.items():
+        for slot in slots:
+            subjects = slot_subjects(slot) or [UNASSIGNED_SUBJECT]
+            hours = (slot["end"] - slot["start"]) / 60 / len(subjects)
+            rows += [(phase, weekday, subject, hours) for subject in subjects]
+    df = pd.DataFrame(rows, columns=["phase", "weekday", "subject", "hours"])
+    return df.groupby(["phase", "weekday", "subject"], as_index=False)["hours"].sum()
+
+@st.cache_data(show_spinner=False)
+def load_planned_hours(version):
+    """Planned hours table for a schedule version; version only keys the cache."""
+    return build_planned_hours(load_schedule_index(version))
+
+def compute_adherence(df_logs, planned):
+    """Joins weekly planned hours against logged hours per (week, subject).
+
+    Each week follows the phase with the most logged hours that week, carried forward through
+    weeks with no logs. Returns week, subject, planned, actual and adherence (actual / planned).
+    """
+    dates = pd.to_datetime(df_logs["date"])
+    logs = pd.DataFrame({
+        "week": dates.dt.to_period("W-SUN").dt.start_time,
+        "phase": df_logs["phase"].to_numpy(),
+        "subject": df_logs["subject"].to_numpy(),
+        "hours": df_logs["hours"].astype(float).to_numpy()
+    })
+
+    phase_hours = logs.groupby(["week", "phase"], as_index=False)["hours"].sum()
+    week_phase = (
+        phase_hours.sort_values("hours")
+        .drop_duplicates("week", keep="last")
+        .set_index("week")["phase"]
+    )
+    weeks = pd.date_range(logs["week"].min(), logs["week"].max(), freq="W-MON")
+    week_phase = week_phase.reindex(weeks).ffill().rename_axis("week").reset_index()
+
+    weekly_plan = planned.groupby(["phase", "subject"], as_index=False)["hours"].sum()
+    plan = week_phase.merge(weekly_plan, on="phase")[["week", "subject", "hours"]]
+    actual = logs.groupby(["week", "subject"], as_index=False)["hours"].sum()
+
+    result = plan.rename(columns={"hours": "planned"}).merge(
+        actual.rename(columns={"hours": "actual"}), on=["week", "subject"], how="outer"
+    ).fillna({"planned": 0.0, "actual": 0.0})
+    planned_hours_values = result["planned"].to_numpy()
+    result["adherence"] = np.divide(
+        result["actual"].to_numpy(), planned_hours_values,
+        out=np.full(len(result), np.nan), where=planned_hours_values > 0
+    )
+    return result.sort_values(["week", "subject"]).reset_index(drop=True)
+
+# Columnar Snapshots
+SNAPSHOT_DIR = Path("snapshots")
+SNAPSHOT_MAX_AGE_SECONDS = 300
+SNAPSHOT_PAGE_SIZE = 1000
+# Stable sort keys for paging whole tables with fetch_table_rows; every table here can be snapshotted
+TABLE_ORDER_COLUMNS = {
+    "progress_logs": "id",
+    "question_bank": "id",
+    "revision_notes": "id",
+    "resources": "id",
+    "study_goals": "id",
+    "schedule": "phase",
+    "schedule_slots": "phase,position"
+}
+
+def snapshot_path(table_name):
+    return SNAPSHOT_DIR / f"{table_name}.arrow"
+
+def fetch_table_rows(table_name, columns="*", page_size=SNAPSHOT_PAGE_SIZE, filters=None, storage=None):
+    """Fetches every (matching) row of a table from storage, paging past the per-request row limit."""
+    storage = storage or get_storage()
+    order_column = TABLE_ORDER_COLUMNS[table_name]
+    rows = []
+    start = 0
+    while True:
+        page = storage.select(
+            table_name, columns, filters=filters, order=order_column, offset=start, limit=page_size
+        )
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+def write_snapshot(table_name, rows):
+    """Writes rows to an uncompressed Arrow IPC file so later reads can memory-map it."""
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pylist(rows)
+    path = snapshot_path(table_name)
+    # A unique temp file per writer, so concurrent sessions never write into each other's file
+    with tempfile.NamedTemporaryFile(
+        dir=SNAPSHOT_DIR, prefix=f"{table_name}.", suffix=".tmp", delete=False
+    ) as tmp:
+        tmp_path = tmp.name
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def read_snapshot(table_name):
+    """Memory-maps a table snapshot and returns it as a DataFrame, or None if there is none."""
+    path = snapshot_path(table_name)
+    if pa is None or not path.exists():
+        return None
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+def invalidate_snapshot(table_name):
+    """Drops a table snapshot after a write so the next read fetches fresh rows."""
+    try:
+        snapshot_path(table_name).unlink(missing_ok=True)
+    except OSError:
+        pass
+
+def load_table_frame(table_name):
+    """Returns a table as a DataFrame, serving a fresh snapshot when one exists.
+
+    Falls back to a stale snapshot with a warning when Supabase is unreachable.
+    """
+    path = snapshot_path(table_name)
+    if pa is not None and path.exists() and time.time() - path.stat().st_mtime < SNAPSHOT_MAX_AGE_SECONDS:
+        return read_snapshot(table_name)
+
+    try:
+        rows = fetch_table_rows(table_name)
+    except Exception as e:
+        stale = read_snapshot(table_name)
+        if stale is None:
+            raise
+        taken_at = datetime.datetime.fromtimestamp(path.stat().st_mtime)
+        st.warning(f"Database unreachable ({str(e)}). Showing {table_name} as of {taken_at:%Y-%m-%d %H:%M}.")
+        return stale
+
+    if pa is not None:
+        write_snapshot(table_name, rows)
+    return pd.DataFrame(rows)
+
+def load_table_records(table_name):
+    """Returns a table as a list of row dicts through load_table_frame, with None for missing values."""
+    df = load_table_frame(table_name)
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+# Upload Store
+UPLOAD_DIR = Path("uploads")
+# Blobs live under static/ so Streamlit serves them directly (server.enableStaticServing)
+BLOB_DIR = STATIC_DIR / "blobs"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def blob_path(blob_hash, ext=""):
+    return BLOB_DIR / blob_hash[:2] / f"{blob_hash}{ext}"
+
+def hash_upload(uploaded_file):
+    """Returns the SHA-256 hex digest of an upload, read in UPLOAD_CHUNK_SIZE chunks."""
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(UPLOAD_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def store_upload(uploaded_file):
+    """Stores an upload under its content hash and returns (blob_hash, path).
+
+    Content that is already stored is not written again.
+    """
+    blob_hash = hash_upload(uploaded_file)
+    path = blob_path(blob_hash, Path(uploaded_file.name).suffix.lower())
+    if path.exists():
+        return blob_hash, str(path)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    uploaded_file.seek(0)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+        for chunk in iter(lambda: uploaded_file.read(UPLOAD_CHUNK_SIZE), b""):
+            tmp.write(chunk)
+    os.replace(tmp.name, path)
+    return blob_hash, str(path)
+
+def static_url(filename):
+    """Returns the static-serving URL for a file under STATIC_DIR, or None for files outside it."""
+    try:
+        relative = Path(filename).resolve().relative_to(STATIC_DIR.resolve())
+    except (OSError, ValueError):
+        return None
+    return f"app/static/{relative.as_posix()}"
+
+def release_upload(filename):
+    """Removes a stored file once no resource refers to it any more."""
+    if not filename:
+        return
+    references, _ = get_storage().table_stats("resources", filters={"filename": filename})
+    if references == 0 and os.path.exists(filename):
+        os.remove(filename)
+
+# Question Search
+QUESTION_PAGE_SIZES = [10, 25, 50, 100]
+QUESTION_FETCH_BATCH_SIZE = 200
+QUESTION_INDEX_PATH = "question_index.db"
+QUESTION_SEARCH_WEIGHTS = (2.0, 1.0, 0.5)  # subject, question, answer
+
+def build_fts_query(search_term):
+    """Turns free text into an FTS5 query: quoted text is a phrase, every other word a prefix term.
+
+    An unmatched quote is treated as a space, so 'a"b' searches for a and b.
+    """
+    if search_term.count('"') % 2:
+        stray = search_term.rindex('"')
+        search_term = search_term[:stray] + " " + search_term[stray + 1:]
+    phrases = [" ".join(re.findall(r"\w+", p)) for p in re.findall(r'"([^"]*)"', search_term)]
+    words = re.findall(r"\w+", re.sub(r'"[^"]*"', " ", search_term))
+    parts = [f'"{phrase}"' for phrase in phrases if phrase]
+    parts += [f'"{word}"*' for word in words]
+    return " AND ".join(parts)
+
+class QuestionSearchIndex:
+    """Inverted full-text index of the question bank kept in a local SQLite FTS5 table."""
+
+    def __init__(self, path=QUESTION_INDEX_PATH):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS question_fts USING fts5("
+                "subject, question, answer, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+
+    def add(self, rows):
+        """Indexes question rows, replacing any existing entries with the same id."""
+        values = [(r["id"], r["subject"], r["question"], r.get("answer") or "") for r in rows]
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM question_fts WHERE rowid = ?", [(v[0],) for v in values])
+            self.conn.executemany(
+                "INSERT INTO question_fts(rowid, subject, question, answer) VALUES (?, ?, ?, ?)", values
+            )
+
+    def remove(self, question_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM question_fts WHERE rowid = ?", (question_id,))
+
+    def rebuild(self, rows):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM question_fts")
+        self.add(rows)
+
+    def stats(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*), MAX(rowid) FROM question_fts").fetchone()
+
+    def search(self, search_term, limit=None):
+        """Returns the ids of every question matching the search term (or the first limit), best bm25 rank first."""
+        query = build_fts_query(search_term)
+        if not query:
+            return []
+        weights = ", ".join(str(w) for w in QUESTION_SEARCH_WEIGHTS)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT rowid FROM question_fts WHERE question_fts MATCH ? "
+                f"ORDER BY bm25(question_fts, {weights}) LIMIT ?",
+                (query, -1 if limit is None else limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+@st.cache_resource
+def get_question_index():
+    """Returns the process-wide question search index."""
+    return QuestionSearchIndex()
+
+def sync_question_index():
+    """Rebuilds the search index if the question bank was changed outside this process."""
+    index = get_question_index()
+    count, latest_id = get_storage().table_stats("question_bank")
+    if tuple(index.stats()) != (count, latest_id):
+        index.rebuild(fetch_table_rows("question_bank", "id,subject,question,answer"))
+    return index
+
 # Global Lists for Dropdowns
 SUBJECT_LIST = [
     "Linear Algebra",
@@ -452,6 +1795,488 @@ SUBJECT_LIST = [
     "General Aptitude"
 ]
 
+# Question Import
+QUESTION_IMPORT_BATCH_SIZE = 500
+QUESTION_IMPORT_TYPES = ["csv", "jsonl", "pdf"]
+QUESTION_NUMBER_PATTERN = re.compile(
+    r"^[ \t]*(?:Q(?:uestion)?[ \t]*\.?[ \t]*\d{1,3}[ \t]*[.):]?|\d{1,3}[ \t]*[.)])[ \t]+",
+    re.IGNORECASE | re.MULTILINE
+)
+
+def normalize_question_text(text):
+    """Lowercases text and reduces it to its words so formatting differences do not matter."""
+    return " ".join(re.findall(r"\w+", str(text).lower()))
+
+def question_hash(text):
+    return hashlib.sha1(normalize_question_text(text).encode("utf-8")).hexdigest()
+
+def split_numbered_questions(text):
+    """Splits text extracted from a question paper at numbered question headings like "Q.12" or "12)"."""
+    starts = [m.start() for m in QUESTION_NUMBER_PATTERN.finditer(text)]
+    chunks = [text[a:b] for a, b in zip(starts, starts[1:] + [len(text)])]
+    return [QUESTION_NUMBER_PATTERN.sub("", chunk, count=1).strip() for chunk in chunks]
+
+def parse_question_file(uploaded_file, default_subject):
+    """Reads a CSV, JSONL or PDF upload into a DataFrame with subject, question and answer columns."""
+    ext = uploaded_file.name.rsplit(".", 1)[-1].lower()
+    if ext == "csv":
+        df = pd.read_csv(uploaded_file, dtype=str)
+    elif ext == "jsonl":
+        df = pd.read_json(uploaded_file, lines=True, dtype=False)
+    elif ext == "pdf" and PyPDF2:
+        reader = PyPDF2.PdfReader(uploaded_file)
+        text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        df = pd.DataFrame({"question": split_numbered_questions(text)})
+    else:
+        raise ValueError(f"Unsupported question file: {uploaded_file.name}")
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    for column in ("subject", "question", "answer"):
+        if column not in df:
+            df[column] = None
+    df["subject"] = df["subject"].fillna(default_subject)
+    return df[["subject", "question", "answer"]]
+
+def prepare_question_import(df, existing_hashes):
+    """Validates and deduplicates imported questions.
+
+    Returns the rows to insert and a report counting invalid rows and
+    duplicates, either within the file or against existing_hashes.
+    """
+    subjects = {s.lower(): s for s in SUBJECT_LIST}
+    df = df.copy()
+    df["question"] = df["question"].fillna("").astype(str).str.strip()
+    df["answer"] = df["answer"].fillna("").astype(str).str.strip()
+    df["subject"] = df["subject"].astype(str).str.strip().str.lower().map(subjects)
+
+    valid = df["question"].ne("") & df["subject"].notna()
+    df_valid = df[valid].copy()
+    df_valid["hash"] = df_valid["question"].map(question_hash)
+    duplicate = df_valid["hash"].isin(existing_hashes) | df_valid["hash"].duplicated()
+
+    rows = df_valid.loc[~duplicate, ["subject", "question", "answer"]].to_dict("records")
+    report = {
+        "read": len(df),
+        "invalid": int((~valid).sum()),
+        "duplicates": int(duplicate.sum()),
+        "new": len(rows)
+    }
+    return rows, report
+
+def get_question_hashes():
+    """Returns the normalized-text hashes of every question in the bank."""
+    return {question_hash(row["question"]) for row in fetch_table_rows("question_bank", "id,question")}
+
+def bulk_insert_questions(rows, batch_size=QUESTION_IMPORT_BATCH_SIZE, progress=None):
+    """Inserts questions in batches, calling progress(done, total) after each batch."""
+    inserted_count = 0
+    for start in range(0, len(rows), batch_size):
+        inserted = get_storage().insert("question_bank", rows[start:start + batch_size])
+        invalidate_snapshot("question_bank")
+        get_question_index().add(inserted)
+        for row in inserted:
+            get_duplicate_index().add(row["id"], row["question"])
+        add_review_items("question", [row["id"] for row in inserted])
+        inserted_count += len(inserted)
+        if progress:
+            progress(min(start + batch_size, len(rows)), len(rows))
+    return inserted_count
+
+# Near-Duplicate Detection
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+NEAR_DUPLICATE_THRESHOLD = 0.7
+_minhash_rng = np.random.default_rng(2026)
+MINHASH_A = _minhash_rng.integers(0, 2 ** 64, MINHASH_PERMUTATIONS, dtype=np.uint64, endpoint=False) | np.uint64(1)
+MINHASH_B = _minhash_rng.integers(0, 2 ** 64, MINHASH_PERMUTATIONS, dtype=np.uint64, endpoint=False)
+
+SHINGLE_WEIGHTS = np.array([256 ** i for i in range(SHINGLE_SIZE)], dtype=np.uint64)
+
+def shingle_hashes(text):
+    """Returns the distinct hashes of the overlapping SHINGLE_SIZE-byte shingles of the normalized text."""
+    data = np.frombuffer(normalize_question_text(text).encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(data) < SHINGLE_SIZE:
+        data = np.pad(data, (0, SHINGLE_SIZE - len(data))) if len(data) else data
+    if len(data) == 0:
+        return data
+    windows = np.lib.stride_tricks.sliding_window_view(data, SHINGLE_SIZE)
+    return np.unique(windows @ SHINGLE_WEIGHTS)
+
+def minhash_signature(text):
+    """Returns the MinHash signature of a question, or None if it has no words."""
+    hashes = shingle_hashes(text)
+    if len(hashes) == 0:
+        return None
+    # Multiply-shift hashing: the uint64 products wrap, and the high 32 bits are the hash
+    return ((np.outer(hashes, MINHASH_A) + MINHASH_B) >> np.uint64(32)).min(axis=0)
+
+class NearDuplicateIndex:
+    """MinHash LSH index of question texts.
+
+    Signatures are split into LSH_BANDS bands and each band is hashed to a
+    bucket, so a lookup only compares a question against those sharing a bucket.
+    """
+
+    def __init__(self):
+        self.signatures = {}
+        # Ids of questions with no words to sign, kept so stats() still covers them
+        self.unsigned = set()
+        self.buckets = [defaultdict(set) for _ in range(LSH_BANDS)]
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _band_keys(signature):
+        return [band.tobytes() for band in signature.reshape(LSH_BANDS, -1)]
+
+    def add(self, question_id, text):
+        signature = minhash_signature(text)
+        if signature is None:
+            with self.lock:
+                self.unsigned.add(question_id)
+            return
+        with self.lock:
+            self.signatures[question_id] = signature
+            for band, key in enumerate(self._band_keys(signature)):
+                self.buckets[band][key].add(question_id)
+
+    def remove(self, question_id):
+        with self.lock:
+            self.unsigned.discard(question_id)
+            signature = self.signatures.pop(question_id, None)
+            if signature is None:
+                return
+            for band, key in enumerate(self._band_keys(signature)):
+                self.buckets[band][key].discard(question_id)
+
+    def _similar(self, signature, exclude=None, threshold=NEAR_DUPLICATE_THRESHOLD):
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates |= self.buckets[band].get(key, set())
+        candidates.discard(exclude)
+        matches = []
+        for candidate in candidates:
+            similarity = float((self.signatures[candidate] == signature).mean())
+            if similarity >= threshold:
+                matches.append((candidate, similarity))
+        return sorted(matches, key=lambda m: m[1], reverse=True)
+
+    def query(self, text, threshold=NEAR_DUPLICATE_THRESHOLD):
+        """Returns (question id, estimated Jaccard similarity) pairs for near-duplicates of text."""
+        signature = minhash_signature(text)
+        if signature is None:
+            return []
+        with self.lock:
+            return self._similar(signature, threshold=threshold)
+
+    def duplicates_of(self, question_id, threshold=NEAR_DUPLICATE_THRESHOLD):
+        with self.lock:
+            signature = self.signatures.get(question_id)
+            return [] if signature is None else self._similar(signature, question_id, threshold)
+
+    def groups(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        """Clusters indexed questions into near-duplicate groups of two or more ids."""
+        parent = {}
+
+        def find(x):
+            while parent.get(x, x) != x:
+                x = parent[x]
+            return x
+
+        with self.lock:
+            for question_id, signature in self.signatures.items():
+                for other, _ in self._similar(signature, question_id, threshold):
+                    root_a, root_b = find(question_id), find(other)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        groups = defaultdict(list)
+        for question_id in parent:
+            groups[find(question_id)].append(question_id)
+        for root in list(groups):
+            if root not in groups[root]:
+                groups[root].append(root)
+        return [sorted(ids) for ids in groups.values()]
+
+    def stats(self):
+        """Returns (number of ids seen, highest id) to compare against table_stats."""
+        with self.lock:
+            return (len(self.signatures) + len(self.unsigned),
+                    max([*self.signatures, *self.unsigned], default=None))
+
+    def rebuild(self, rows):
+        with self.lock:
+            self.signatures = {}
+            self.unsigned = set()
+            self.buckets = [defaultdict(set) for _ in range(LSH_BANDS)]
+        for row in rows:
+            self.add(row["id"], row["question"])
+
+@st.cache_resource
+def get_duplicate_index():
+    """Returns the process-wide near-duplicate index."""
+    return NearDuplicateIndex()
+
+def sync_duplicate_index():
+    """Rebuilds the near-duplicate index if the question bank was changed outside this process."""
+    index = get_duplicate_index()
+    count, latest_id = get_storage().table_stats("question_bank")
+    if index.stats() != (count, latest_id):
+        index.rebuild(fetch_table_rows("question_bank", "id,question"))
+    return index
+
+def dedupe_questions(questions):
+    """Drops questions that are near-duplicates of an earlier question in the list."""
+    index = get_duplicate_index()
+    kept_ids = set()
+    kept = []
+    for q in questions:
+        if not any(other in kept_ids for other, _ in index.duplicates_of(q["id"])):
+            kept_ids.add(q["id"])
+            kept.append(q)
+    return kept
+
+# Mock Tests
+MOCK_TEST_DURATIONS = [15, 30, 60, 180]
+MOCK_TEST_SIZES = [10, 20, 30, 65]
+NUMERIC_ANSWER_TOLERANCE = 0.01
+ANSWER_RANGE_PATTERN = re.compile(r"\s*(-?\d+(?:\.\d+)?)\s*to\s*(-?\d+(?:\.\d+)?)\s*", re.IGNORECASE)
+
+def question_bank_version():
+    """Returns a cache key that changes whenever questions are added or removed."""
+    count, latest_id = get_storage().table_stats("question_bank")
+    return f"{count}-{latest_id}"
+
+@st.cache_data(show_spinner=False)
+def load_question_id_frame(version):
+    """Loads the id and subject of every question; version only keys the cache."""
+    return pd.DataFrame(fetch_table_rows("question_bank", "id,subject"), columns=["id", "subject"])
+
+@st.cache_data(show_spinner=False)
+def load_subject_question_ids(version):
+    """Loads question ids grouped by subject; version only keys the cache."""
+    df = load_question_id_frame(version)
+    return {subject: ids.to_numpy() for subject, ids in df.groupby("subject")["id"]}
+
+def get_subject_question_ids():
+    """Returns the per-subject question id index, reloading it only when the bank changes."""
+    return load_subject_question_ids(question_bank_version())
+
+def sample_mock_questions(subject_ids, subjects, total):
+    """Draws about total question ids spread evenly over subjects, without replacement."""
+    pools = {s: subject_ids[s] for s in subjects if len(subject_ids.get(s, [])) > 0}
+    quotas = dict.fromkeys(pools, 0)
+    remaining = min(total, sum(len(ids) for ids in pools.values()))
+
+    # Hand out one slot per subject per round so small subjects cap out and the rest refill
+    while remaining > 0:
+        open_subjects = [s for s in pools if quotas[s] < len(pools[s])]
+        for subject in random.sample(open_subjects, min(remaining, len(open_subjects))):
+            quotas[subject] += 1
+            remaining -= 1
+
+    sampled = [int(i) for s, n in quotas.items() for i in random.sample(list(pools[s]), n)]
+    random.shuffle(sampled)
+    return sampled
+
+def check_answer(given, expected):
+    """Returns True/False for a graded answer, or None when the question has no stored answer.
+
+    Numeric answers match within NUMERIC_ANSWER_TOLERANCE or inside an
+    "a to b" range; other answers must match after normalization.
+    """
+    expected = (expected or "").strip()
+    if not normalize_question_text(expected):
+        return None
+    given = (given or "").strip()
+
+    answer_range = ANSWER_RANGE_PATTERN.fullmatch(expected)
+    try:
+        value = float(given)
+        if answer_range:
+            low, high = sorted(float(x) for x in answer_range.groups())
+            return low <= value <= high
+        target = float(expected)
+        return abs(value - target) <= NUMERIC_ANSWER_TOLERANCE * max(1.0, abs(target))
+    except ValueError:
+        return normalize_question_text(given) == normalize_question_text(expected)
+
+def score_mock_test(questions, answers):
+    """Grades a test and returns per-question results plus per-subject tallies."""
+    results = []
+    subject_totals = defaultdict(lambda: {"attempted": 0, "correct": 0})
+    for q in questions:
+        given = answers.get(q["id"], "")
+        correct = check_answer(given, q["answer"])
+        results.append({"id": q["id"], "subject": q["subject"], "given": given, "correct": correct})
+        if correct is not None:
+            subject_totals[q["subject"]]["attempted"] += 1
+            subject_totals[q["subject"]]["correct"] += int(correct)
+    return results, dict(subject_totals)
+
+def record_mock_attempt(test, results, subject_totals):
+    """Stores a finished attempt and folds its tallies into the per-subject accuracy rollup."""
+    try:
+        graded = [r for r in results if r["correct"] is not None]
+        correct = sum(1 for r in graded if r["correct"])
+        get_storage().insert("mock_attempts", {
+            "started_at": datetime.datetime.fromtimestamp(test["started_at"]).isoformat(),
+            "submitted_at": datetime.datetime.now().isoformat(),
+            "duration_minutes": test["duration"],
+            "total": len(results),
+            "correct": correct,
+            "unscored": len(results) - len(graded),
+            "score": round(correct / len(graded) * 100, 1) if graded else 0.0,
+            "results_json": json.dumps(results)
+        })
+
+        if subject_totals:
+            storage = get_storage()
+            storage.upsert("subject_accuracy", [
+                {"subject": subject, "attempted": 0, "correct": 0} for subject in subject_totals
+            ], on_conflict="subject", ignore_duplicates=True)
+            for column in ("attempted", "correct"):
+                storage.increment("subject_accuracy", column, {
+                    subject: totals[column] for subject, totals in subject_totals.items()
+                }, key="subject")
+        return True
+    except Exception as e:
+        st.error(f"Error saving mock test attempt: {str(e)}")
+        return False
+
+def get_subject_accuracy():
+    """Retrieves the per-subject accuracy rollup."""
+    try:
+        return get_storage().select("subject_accuracy")
+    except Exception as e:
+        st.error(f"Error fetching subject accuracy: {str(e)}")
+        return []
+
+def get_mock_attempts(limit=50):
+    """Retrieves the most recent mock test attempts without their per-question results."""
+    try:
+        return get_storage().select(
+            "mock_attempts", "id,submitted_at,duration_minutes,total,correct,unscored,score",
+            order="id", desc=True, limit=limit
+        )
+    except Exception as e:
+        st.error(f"Error fetching mock test attempts: {str(e)}")
+        return []
+
+# Spaced Repetition
+REVIEW_ITEM_TABLES = {"question": "question_bank", "note": "revision_notes"}
+REVIEW_QUEUE_SIZE = 50
+# Grades are written in batches; leaving the page or finishing the queue flushes the rest
+REVIEW_FLUSH_SIZE = 5
+REVIEW_FLUSH_SECONDS = 60
+REVIEW_GRADES = {"Again": 1, "Hard": 3, "Good": 4, "Easy": 5}
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+def new_review_state(item_type, item_id, today=None):
+    today = today or datetime.date.today()
+    return {
+        "item_type": item_type,
+        "item_id": item_id,
+        "ease": DEFAULT_EASE,
+        "interval_days": 0,
+        "repetitions": 0,
+        "due_date": today.isoformat(),
+        "last_reviewed": None
+    }
+
+def schedule_review(state, quality, today=None):
+    """Applies an SM-2 review with quality 0-5 and returns the updated state."""
+    today = today or datetime.date.today()
+    state = dict(state)
+    if quality < 3:
+        state["repetitions"] = 0
+        state["interval_days"] = 1
+    else:
+        state["repetitions"] += 1
+        if state["repetitions"] == 1:
+            state["interval_days"] = 1
+        elif state["repetitions"] == 2:
+            state["interval_days"] = 6
+        else:
+            state["interval_days"] = round(state["interval_days"] * state["ease"])
+    state["ease"] = max(MIN_EASE, state["ease"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    state["due_date"] = (today + datetime.timedelta(days=state["interval_days"])).isoformat()
+    state["last_reviewed"] = today.isoformat()
+    return state
+
+def add_review_items(item_type, item_ids):
+    """Schedules newly created items for review today."""
+    if item_ids:
+        get_storage().upsert(
+            "review_state",
+            [new_review_state(item_type, item_id) for item_id in item_ids],
+            on_conflict="item_type,item_id"
+        )
+
+def seed_review_states():
+    """Creates review state for items that predate the scheduler, skipping work when counts agree."""
+    for item_type, table in REVIEW_ITEM_TABLES.items():
+        item_count, _ = get_storage().table_stats(table)
+        state_count, _ = get_storage().table_stats("review_state", "item_id", {"item_type": item_type})
+        if item_count == state_count:
+            continue
+
+        item_ids = {row["id"] for row in fetch_table_rows(table, "id")}
+        state_ids = {
+            row["item_id"] for row in
+            get_storage().select("review_state", "item_id", filters={"item_type": item_type})
+        }
+        missing = sorted(item_ids - state_ids)
+        for start in range(0, len(missing), QUESTION_IMPORT_BATCH_SIZE):
+            add_review_items(item_type, missing[start:start + QUESTION_IMPORT_BATCH_SIZE])
+
+def get_due_reviews(limit=REVIEW_QUEUE_SIZE, today=None):
+    """Returns the review states due by today, oldest first, read through the due_date index."""
+    today = today or datetime.date.today()
+    try:
+        return get_storage().select(
+            "review_state", filters={"due_date__lte": today.isoformat()},
+            order="due_date", limit=limit
+        )
+    except Exception as e:
+        st.error(f"Error fetching due reviews: {str(e)}")
+        return []
+
+def get_review_items(states):
+    """Loads the question or note behind each review state, keyed by (item_type, item_id)."""
+    items = {}
+    question_ids = [s["item_id"] for s in states if s["item_type"] == "question"]
+    for row in get_question_page(question_ids):
+        items[("question", row["id"])] = row
+    note_ids = [s["item_id"] for s in states if s["item_type"] == "note"]
+    if note_ids:
+        for row in get_storage().select("revision_notes", filters={"id": note_ids}):
+            items[("note", row["id"])] = row
+    return items
+
+def flush_review_outcomes(force=True):
+    """Writes buffered review outcomes in one upsert; they stay pending for a retry if it fails.
+
+    Unless forced, waits until REVIEW_FLUSH_SIZE outcomes are pending or the oldest is
+    REVIEW_FLUSH_SECONDS old.
+    """
+    pending = st.session_state.get("pending_reviews", {})
+    if not pending:
+        return True
+    pending_since = st.session_state.get("pending_reviews_since") or time.monotonic()
+    if (not force and len(pending) < REVIEW_FLUSH_SIZE
+            and time.monotonic() - pending_since < REVIEW_FLUSH_SECONDS):
+        return True
+    try:
+        get_storage().upsert("review_state", list(pending.values()), on_conflict="item_type,item_id")
+        st.session_state.pending_reviews = {}
+        st.session_state.pending_reviews_since = None
+        return True
+    except Exception as e:
+        st.error(f"Error saving reviews: {str(e)}")
+        return False
+
 # Utility Functions for RAG
 def extract_text_from_file(file_path):
     ext = file_path.split('.')[-1].lower()
@@ -503,6 +2328,8 @@ def get_rag_context(selected_subject):
         questions = get_all_questions()
         subject_questions = [q for q in questions if q["subject"].lower() == selected_subject.lower()]
         if subject_questions:
+            sync_duplicate_index()
+            subject_questions = dedupe_questions(subject_questions)
             q_text = "\n".join([
                 f"Q: {q['question']}\nA: {q['answer'] if q['answer'] else 'No answer provided'}"
                 for q in subject_questions
@@ -526,11 +2353,16 @@ def get_rag_context(selected_subject):
         ]
 
         if subject_resources:
-            r_text = "\n".join([
-                f"Resource: {r['title']} (File: {os.path.basename(r['filename'])})"
-                for r in subject_resources
-            ])
-            context_parts.append("Available Resources:\n" + r_text)
+            ingestor = get_upload_ingestor()
+            r_parts = []
+            for r in subject_resources:
+                r_parts.append(
+                    f"Resource: {r['title']} (File: {r.get('original_name') or os.path.basename(r['filename'])})"
+                )
+                excerpt = ingestor.text(r["blob_hash"]) if r.get("blob_hash") else None
+                if excerpt and excerpt.strip():
+                    r_parts.append(excerpt.strip()[:RAG_RESOURCE_EXCERPT_CHARS])
+            context_parts.append("Available Resources:\n" + "\n".join(r_parts))
 
         return "\n\n".join(context_parts)
 
@@ -538,6 +2370,445 @@ def get_rag_context(selected_subject):
         st.error(f"Error building RAG context: {str(e)}")
         return ""
 
+# Chart Helpers
+MAX_CHART_POINTS = 800
+
+def lttb_indices(x, y, threshold):
+    """Returns the indices of the points kept by Largest-Triangle-Three-Buckets downsampling."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+
+    return selected
+
+def downsample_series(df, x, y, max_points=MAX_CHART_POINTS):
+    """Reduces a line series to at most max_points rows while preserving its peaks and troughs."""
+    if len(df) <= max_points:
+        return df
+    df = df.sort_values(x)
+    x_values = df[x]
+    if pd.api.types.is_datetime64_any_dtype(x_values):
+        x_values = x_values.astype("int64")
+    keep = lttb_indices(x_values.to_numpy(), df[y].to_numpy(), max_points)
+    return df.iloc[keep]
+
+# Export Helpers
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "Gzip CSV": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+    "JSONL": (".jsonl", "application/jsonl")
+}
+SECTIONED_EXPORT_FORMATS = ["CSV", "Gzip CSV"]
+# Exports live under static/ so the browser downloads them straight from disk (server.enableStaticServing)
+EXPORT_DIR = STATIC_DIR / "exports"
+EXPORT_MAX_AGE_SECONDS = 6 * 60 * 60
+
+def available_export_formats():
+    """Returns the export formats usable in this environment."""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "Parquet" or pq is not None]
+
+def sweep_exports(max_age=EXPORT_MAX_AGE_SECONDS):
+    """Removes export files older than max_age, including ones older versions left in the temp dir."""
+    cutoff = time.time() - max_age
+    for directory in (EXPORT_DIR, Path(tempfile.gettempdir())):
+        for path in directory.glob("gate_export_*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+def write_export(sections, export_format):
+    """Writes (title, chunks) sections to a temporary file one chunk at a time and returns its path.
+
+    A title of None writes the chunks without a section heading. Only
+    SECTIONED_EXPORT_FORMATS accept several sections; Parquet and JSONL
+    exports write the chunks of a single section.
+    """
+    suffix, _ = EXPORT_FORMATS[export_format]
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    handle = tempfile.NamedTemporaryFile(dir=EXPORT_DIR, prefix="gate_export_", suffix=suffix, delete=False)
+    handle.close()
+
+    if export_format == "Parquet":
+        writer = None
+        try:
+            for _, chunks in sections:
+                for chunk in chunks:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(handle.name, table.schema)
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return handle.name
+
+    opener = gzip.open if export_format == "Gzip CSV" else open
+    with opener(handle.name, "wt", encoding="utf-8", newline="") as f:
+        if export_format == "JSONL":
+            for _, chunks in sections:
+                for chunk in chunks:
+                    f.write(chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+            return handle.name
+
+        for title, chunks in sections:
+            if title:
+                f.write(f"\n\n{title.upper()}\n\n")
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=(i == 0))
+    return handle.name
+
+def prepare_export_file(state_key, sections, export_format, **meta):
+    """Writes an export and remembers it in session state, removing the previous one."""
+    with st.spinner("Generating export..."):
+        previous_export = st.session_state.get(state_key)
+        if previous_export and os.path.exists(previous_export['path']):
+            os.remove(previous_export['path'])
+        sweep_exports()
+
+        st.session_state[state_key] = {
+            'path': write_export(sections, export_format),
+            'format': export_format,
+            **meta
+        }
+
+def render_export_download(state_key, label, file_stem, export_format, **meta):
+    """Links to the prepared export if it matches the current selection, without reading the file."""
+    export_file = st.session_state.get(state_key)
+    if (not export_file or export_file['format'] != export_format
+            or any(export_file.get(k) != v for k, v in meta.items())
+            or not os.path.exists(export_file['path'])):
+        return
+
+    suffix, _ = EXPORT_FORMATS[export_format]
+    st.markdown(
+        f'<a href="{static_url(export_file["path"])}" download="{html.escape(file_stem + suffix)}" '
+        f'target="_blank">{html.escape(label)} ({export_format})</a>',
+        unsafe_allow_html=True
+    )
+
+# Report Jobs
+REPORTS_DIR = Path("reports")
+REPORT_VERSIONS_TO_KEEP = 2
+
+def build_report_bundle(df_logs):
+    """Computes the summary tables, overall statistics and charts shown on the reports page."""
+    df_logs = df_logs.copy()
+    df_logs['date'] = pd.to_datetime(df_logs['date'])
+    df_logs = df_logs.sort_values('date', kind='stable')
+
+    basic_df = df_logs[['date', 'subject', 'phase', 'hours', 'notes']]
+
+    subject_summary = df_logs.groupby('subject').agg({
+        'hours': ['sum', 'mean', 'count'],
+        'date': 'nunique'
+    }).round(2)
+    subject_summary.columns = ['Total Hours', 'Avg Hours/Session', 'Number of Sessions', 'Number of Days']
+
+    daily_summary = df_logs.groupby('date').agg({
+        'hours': ['sum', 'count'],
+        'subject': 'nunique'
+    }).round(2)
+    daily_summary.columns = ['Total Hours', 'Number of Sessions', 'Subjects Covered']
+
+    phase_summary = df_logs.groupby('phase').agg({
+        'hours': ['sum', 'mean', 'count'],
+        'subject': 'nunique',
+        'date': 'nunique'
+    }).round(2)
+    phase_summary.columns = ['Total Hours', 'Avg Hours/Session', 'Number of Sessions',
+                           'Unique Subjects', 'Number of Days']
+
+    df_logs['month_year'] = df_logs['date'].dt.strftime('%Y-%m')
+    monthly_summary = df_logs.groupby('month_year').agg({
+        'hours': ['sum', 'mean', 'count'],
+        'subject': 'nunique',
+        'date': 'nunique'
+    }).round(2)
+    monthly_summary.columns = ['Total Hours', 'Avg Hours/Session', 'Number of Sessions',
+                             'Unique Subjects', 'Number of Days']
+
+    fig1 = px.line(
+        downsample_series(df_logs.groupby('date')['hours'].sum().reset_index(), 'date', 'hours'),
+        x='date',
+        y='hours',
+        title='Daily Study Hours'
+    )
+
+    fig2 = px.pie(
+        df_logs.groupby('subject')['hours'].sum().reset_index(),
+        values='hours',
+        names='subject',
+        title='Study Hours by Subject'
+    )
+
+    fig3 = px.bar(
+        df_logs.groupby('phase')['hours'].sum().reset_index(),
+        x='phase',
+        y='hours',
+        title='Study Hours by Phase'
+    )
+
+    fig4 = px.bar(
+        df_logs.groupby('month_year')['hours'].sum().reset_index(),
+        x='month_year',
+        y='hours',
+        title='Monthly Study Progress'
+    )
+
+    days_studied = df_logs['date'].nunique()
+    return {
+        'tables': {
+            "Basic Study Log": basic_df,
+            "Subject Summary": subject_summary,
+            "Daily Summary": daily_summary,
+            "Phase Summary": phase_summary,
+            "Monthly Summary": monthly_summary
+        },
+        'stats': {
+            'total_hours': df_logs['hours'].sum(),
+            'total_sessions': len(df_logs),
+            'days_studied': days_studied,
+            'avg_hours_per_day': df_logs['hours'].sum() / days_studied if days_studied > 0 else 0
+        },
+        'figures': {
+            'daily': fig1.to_json(),
+            'subject': fig2.to_json(),
+            'phase': fig3.to_json(),
+            'monthly': fig4.to_json()
+        }
+    }
+
+class ReportJobRunner:
+    """Builds report bundles on a worker thread and caches them on disk by data version."""
+
+    def __init__(self, storage, reports_dir=REPORTS_DIR):
+        self.storage = storage
+        self.reports_dir = Path(reports_dir)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-job")
+        self.jobs = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def bundle_path(self, version):
+        return self.reports_dir / version / "bundle.pkl"
+
+    def load(self, version):
+        """Returns the cached bundle for a data version, or None if it has not been built."""
+        path = self.bundle_path(version)
+        return pd.read_pickle(path) if path.exists() else None
+
+    def latest(self):
+        """Returns the most recently built bundle regardless of version, or None."""
+        marker = self.reports_dir / "latest.json"
+        if not marker.exists():
+            return None
+        with open(marker) as f:
+            return self.load(json.load(f)["version"])
+
+    def submit(self, version):
+        """Queues a build for a data version unless one is already pending and returns its future."""
+        with self.lock:
+            job = self.jobs.get(version)
+            if job is not None:
+                return job
+            self.errors.pop(version, None)
+            job = self.executor.submit(self._build, version)
+            self.jobs[version] = job
+        # Outside the lock: a job that has already finished runs the callback right here
+        job.add_done_callback(lambda done: self._forget(version, done))
+        return job
+
+    def error(self, version):
+        """Returns the exception the last build of a data version failed with, or None."""
+        with self.lock:
+            return self.errors.get(version)
+
+    def _forget(self, version, job):
+        with self.lock:
+            self.jobs.pop(version, None)
+            if job.exception() is not None:
+                self.errors[version] = job.exception()
+                while len(self.errors) > REPORT_VERSIONS_TO_KEEP:
+                    self.errors.pop(next(iter(self.errors)))
+
+    def _build(self, version):
+        rows = fetch_table_rows('progress_logs', storage=self.storage)
+        bundle = build_report_bundle(pd.DataFrame(rows))
+        bundle['version'] = version
+
+        path = self.bundle_path(version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        pd.to_pickle(bundle, tmp_path)
+        os.replace(tmp_path, path)
+
+        marker = self.reports_dir / "latest.json"
+        tmp_marker = marker.with_suffix(".tmp")
+        with open(tmp_marker, "w") as f:
+            json.dump({"version": version, "built_at": datetime.datetime.now().isoformat()}, f)
+        os.replace(tmp_marker, marker)
+
+        self._prune(keep=version)
+        return bundle
+
+    def _prune(self, keep):
+        versions = sorted(
+            (p for p in self.reports_dir.iterdir() if p.is_dir()),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for old in versions[REPORT_VERSIONS_TO_KEEP:]:
+            if old.name != keep:
+                shutil.rmtree(old, ignore_errors=True)
+
+@st.cache_resource
+def get_report_runner():
+    """Returns the process-wide report job runner."""
+    return ReportJobRunner(get_storage())
+
+# Upload Ingestion
+EXTRACTED_TEXT_DIR = UPLOAD_DIR / "extracted"
+THUMBNAIL_DIR = STATIC_DIR / "thumbnails"
+THUMBNAIL_WIDTH = 240
+THUMBNAIL_IMAGE_TYPES = {".png", ".jpg", ".jpeg"}
+RAG_RESOURCE_EXCERPT_CHARS = 1500
+RAG_CONTEXT_MAX_CHARS = 12000
+
+def render_thumbnail(blob_file, path):
+    """Writes a THUMBNAIL_WIDTH-wide PNG preview of a PDF's first page or of an image."""
+    suffix = Path(blob_file).suffix.lower()
+    if suffix == ".pdf":
+        with pymupdf.open(blob_file) as document:
+            page = document[0]
+            zoom = THUMBNAIL_WIDTH / page.rect.width
+            page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom)).save(str(path), output="png")
+    else:
+        with Image.open(blob_file) as image:
+            image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 4))
+            image.convert("RGB").save(path, format="PNG")
+
+class UploadIngestor:
+    """Runs post-upload processing (text extraction, thumbnails) on a worker thread, once per content hash."""
+
+    def __init__(self, text_dir=EXTRACTED_TEXT_DIR, thumbnail_dir=THUMBNAIL_DIR):
+        self.text_dir = Path(text_dir)
+        self.thumbnail_dir = Path(thumbnail_dir)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-ingest")
+        self.jobs = {}
+        self.failed = set()
+        self.lock = threading.Lock()
+
+    def text_path(self, blob_hash):
+        return self.text_dir / f"{blob_hash}.txt"
+
+    def thumbnail_path(self, blob_hash):
+        return self.thumbnail_dir / blob_hash[:2] / f"{blob_hash}.png"
+
+    def thumbnail_url(self, blob_hash):
+        """Returns the static URL of a blob's thumbnail, or None if it has not been rendered."""
+        path = self.thumbnail_path(blob_hash)
+        return static_url(path) if path.exists() else None
+
+    def can_thumbnail(self, blob_file):
+        suffix = Path(blob_file).suffix.lower()
+        if suffix == ".pdf":
+            return pymupdf is not None
+        return suffix in THUMBNAIL_IMAGE_TYPES and Image is not None
+
+    def _pending(self, blob_hash, blob_file):
+        return (
+            not self.text_path(blob_hash).exists()
+            or (self.can_thumbnail(blob_file) and not self.thumbnail_path(blob_hash).exists()
+                and blob_hash not in self.failed)
+        )
+
+    def text(self, blob_hash):
+        """Returns the extracted text of a blob, or None if it has not been extracted yet."""
+        path = self.text_path(blob_hash)
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def submit(self, blob_hash, path):
+        """Queues processing for a blob unless it is done or already pending; returns the future or None."""
+        with self.lock:
+            if blob_hash in self.jobs or not self._pending(blob_hash, path):
+                return self.jobs.get(blob_hash)
+            job = self.executor.submit(self._process, blob_hash, path)
+            self.jobs[blob_hash] = job
+            job.add_done_callback(lambda _: self._forget(blob_hash))
+            return job
+
+    def _forget(self, blob_hash):
+        with self.lock:
+            self.jobs.pop(blob_hash, None)
+
+    def _process(self, blob_hash, blob_file):
+        thumbnail = self.thumbnail_path(blob_hash)
+        if self.can_thumbnail(blob_file) and not thumbnail.exists():
+            thumbnail.parent.mkdir(parents=True, exist_ok=True)
+            tmp_thumbnail = thumbnail.with_suffix(".tmp")
+            try:
+                render_thumbnail(blob_file, tmp_thumbnail)
+                os.replace(tmp_thumbnail, thumbnail)
+            except Exception:
+                self.failed.add(blob_hash)
+                tmp_thumbnail.unlink(missing_ok=True)
+
+        path = self.text_path(blob_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(extract_text_from_file(str(blob_file)), encoding="utf-8")
+            os.replace(tmp_path, path)
+
+@st.cache_resource
+def get_upload_ingestor():
+    """Returns the process-wide upload ingestor."""
+    return UploadIngestor()
+
+def upload_id(uploaded_file):
+    """Identifies one upload in a file_uploader; uploading the same file again gets a new id."""
+    return getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+
+def ingest_upload(uploaded_file):
+    """Stores an upload and queues its processing once per upload id, returning (blob_hash, path).
+
+    Reruns with the same upload are a session_state lookup, so they do not re-read the file.
+    """
+    ingested = st.session_state.setdefault("ingested_uploads", {})
+    key = upload_id(uploaded_file)
+    if key not in ingested:
+        blob_hash, path = store_upload(uploaded_file)
+        get_upload_ingestor().submit(blob_hash, path)
+        ingested[key] = (blob_hash, path)
+    return ingested[key]
+
 # Streamlit App Pages
 def display_dataframe(df, hide_index=True):
     """Helper function to display dataframes with hidden index"""
@@ -569,7 +2840,7 @@ def dashboard_page():
 
             if submitted:
                 try:
-                    date_str = session_date.strftime("%-m/%-d/%Y")
+                    date_str = session_date.isoformat()
                     success = insert_progress_log(date_str, selected_phase, selected_subject, hours, notes)
 
                     if success:
@@ -580,18 +2851,19 @@ def dashboard_page():
                 except Exception as e:
                     st.error(f"Error logging session: {str(e)}")
 
+        if schedules:
+            st.header("Today's Schedule")
+            render_schedule_today(phase_options)
+
     except Exception as e:
         st.error(f"Error loading dashboard: {str(e)}")
         return
 
     try:
-        logs_response = supabase.table('progress_logs').select(
-            'id,date,phase,subject,hours,notes'
-        ).order('date', desc=True).execute()
+        df_logs = load_table_frame('progress_logs')
 
-        if isinstance(logs_response.data, list) and len(logs_response.data) > 0:
+        if len(df_logs) > 0:
             st.header("Study Sessions Log")
-            df_logs = pd.DataFrame(logs_response.data)
 
             df_logs['date'] = pd.to_datetime(df_logs['date'])
             df_logs = df_logs.sort_values('date', ascending=False)
@@ -623,19 +2895,18 @@ def analytics_page():
     st.title("Progress Analytics")
 
     try:
-        logs_response = supabase.table('progress_logs').select('*').execute()
+        df_logs = load_table_frame('progress_logs')
 
-        if not hasattr(logs_response, 'data') or not logs_response.data:
+        if len(df_logs) == 0:
             st.info("No study session data available for analytics.")
             return
 
-        logs = logs_response.data
-
-        df_logs = pd.DataFrame(logs)
         df_logs["date"] = pd.to_datetime(df_logs["date"])
         df_logs.sort_values("date", inplace=True)
 
-        tab1, tab2, tab3 = st.tabs(["Progress Summary", "Time Analysis", "Subject Analysis"])
+        tab1, tab2, tab3, tab4 = st.tabs(
+            ["Progress Summary", "Time Analysis", "Subject Analysis", "Plan Adherence"]
+        )
 
         with tab1:
             st.header("Progress Summary")
@@ -672,6 +2943,7 @@ def analytics_page():
 
             if time_analysis == "Daily Trend":
                 daily_hours = df_logs.groupby("date")["hours"].sum().reset_index()
+                daily_hours = downsample_series(daily_hours, "date", "hours")
                 fig = px.line(daily_hours, x="date", y="hours",
                              title="Daily Study Hours",
                              labels={"hours": "Hours", "date": "Date"})
@@ -698,8 +2970,9 @@ def analytics_page():
                 st.plotly_chart(fig, use_container_width=True, key='tab_month')
 
             else:
-                df_logs["cumulative_hours"] = df_logs["hours"].cumsum()
-                fig = px.line(df_logs, x="date", y="cumulative_hours",
+                cumulative = df_logs.groupby("date")["hours"].sum().cumsum().reset_index(name="cumulative_hours")
+                cumulative = downsample_series(cumulative, "date", "cumulative_hours")
+                fig = px.line(cumulative, x="date", y="cumulative_hours",
                              title="Cumulative Study Hours")
                 st.plotly_chart(fig, use_container_width=True, key='tab_cumulative')
 
@@ -728,6 +3001,44 @@ def analytics_page():
             session_details = subject_data[["date", "phase", "hours", "notes"]].sort_values("date", ascending=False)
             st.dataframe(session_details)
 
+        with tab4:
+            st.header("Planned vs Actual")
+
+            planned = load_planned_hours(get_schedule_version())
+            if planned.empty:
+                st.info("No schedule slots with a day and time range to compare against.")
+            else:
+                adherence = compute_adherence(df_logs, planned)
+                weekly = adherence.groupby("week", as_index=False)[["planned", "actual"]].sum()
+                total_planned = weekly["planned"].sum()
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Planned Hours", f"{total_planned:.1f}")
+                with col2:
+                    st.metric("Logged Hours", f"{weekly['actual'].sum():.1f}")
+                with col3:
+                    overall = weekly["actual"].sum() / total_planned * 100 if total_planned > 0 else 0
+                    st.metric("Overall Adherence", f"{overall:.0f}%")
+
+                weekly["Adherence %"] = weekly["actual"] / weekly["planned"].where(weekly["planned"] > 0) * 100
+                fig = px.line(weekly, x="week", y="Adherence %", markers=True,
+                             title="Weekly Adherence to the Study Plan")
+                st.plotly_chart(fig, use_container_width=True, key='tab_adherence')
+
+                subject_view = adherence.pivot(index="week", columns="subject", values="adherence") * 100
+                fig = px.imshow(
+                    subject_view.T, aspect="auto", color_continuous_scale="RdYlGn",
+                    zmin=0, zmax=150, labels={"color": "Adherence %", "x": "Week", "y": "Subject"},
+                    title="Adherence by Week and Subject"
+                )
+                st.plotly_chart(fig, use_container_width=True, key='tab_adherence_subjects')
+
+                st.dataframe(
+                    adherence.assign(week=adherence["week"].dt.strftime("%Y-%m-%d")).round(2),
+                    hide_index=True
+                )
+
     except Exception as e:
         st.error(f"Error in analytics: {str(e)}")
         return
@@ -741,7 +3052,7 @@ def study_planner_page():
 
         if not schedules:
             st.warning("No schedule data available. Initializing default schedules...")
-            init_db()
+            init_db(force=True)
             schedules = get_all_schedules()
 
         if not schedules:
@@ -769,15 +3080,16 @@ def study_planner_page():
                         columns=["Day", "Time Slot", "Activity", "Details"]
                     )
 
-                    if hasattr(st, "experimental_data_editor"):
-                        edited_df = st.experimental_data_editor(
+                    data_editor = getattr(st, "data_editor", None) or getattr(st, "experimental_data_editor", None)
+                    if data_editor:
+                        edited_df = data_editor(
                             df_phase,
                             num_rows="dynamic",
                             key=f"schedule_{phase}"
                         )
                         if st.button("Save changes", key=f"save_{phase}"):
-                            update_schedule_db(phase, edited_df.values.tolist())
-                            st.success(f"Schedule for {phase} saved!")
+                            if update_schedule_db(phase, phase_info["table"], edited_df.fillna("").values.tolist()):
+                                st.success(f"Schedule for {phase} saved!")
                     else:
                         st.dataframe(df_phase)
                 else:
@@ -813,16 +3125,14 @@ def revision_hub_page():
     st.markdown("### Upload Additional Revision Resources (PDF/Images)")
     uploaded_file = st.file_uploader("Upload a file", type=["pdf", "docx", "xlsx", "png", "jpg"])
     if uploaded_file:
-        upload_folder = "uploads"
-        if not os.path.exists(upload_folder):
-            os.makedirs(upload_folder)
-        file_path = os.path.join(upload_folder, uploaded_file.name)
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
         subject_for_resource = st.text_input("Enter subject for this resource (optional)")
         title = st.text_input("Enter title for this resource (optional)", value=uploaded_file.name)
-        insert_resource(subject_for_resource, title, "", file_path)
-        st.success("Resource uploaded and saved!")
+        if st.button("Save Resource"):
+            # Stored only on save, so a file that never becomes a resource leaves no unreferenced blob
+            blob_hash, file_path = ingest_upload(uploaded_file)
+            if save_file_resource(upload_id(uploaded_file), subject_for_resource, title,
+                                  file_path, blob_hash, uploaded_file.name):
+                st.success("Resource uploaded and saved!")
 
 def question_bank_page():
     st.title("Question Bank")
@@ -832,59 +3142,417 @@ def question_bank_page():
         subject = st.selectbox("Subject", SUBJECT_LIST)
         question_text = st.text_area("Question")
         answer_text = st.text_area("Answer / Pattern (optional)")
+        allow_duplicate = st.checkbox("Add even if a similar question exists")
         submit = st.form_submit_button("Add Question")
 
         if submit:
             if subject and question_text:
-                if insert_question(subject, question_text, answer_text):
+                similar = [] if allow_duplicate else sync_duplicate_index().query(question_text)
+                if similar:
+                    st.warning("This looks like a question already in the bank:")
+                    for row in get_question_page([question_id for question_id, _ in similar[:3]]):
+                        st.markdown(f"- **{row['subject']}:** {row['question']}")
+                elif insert_question(subject, question_text, answer_text):
                     st.success("Question added successfully!")
                     st.rerun()
             else:
                 st.error("Please provide both a subject and a question.")
 
+    with st.expander("Bulk Import & Export"):
+        import_tab, export_tab, duplicates_tab = st.tabs(["Import", "Export", "Duplicates"])
+
+        with import_tab:
+            import_file = st.file_uploader(
+                "CSV or JSONL with subject, question and answer columns, or a question paper PDF",
+                type=QUESTION_IMPORT_TYPES,
+                key="question_import_file"
+            )
+            default_subject = st.selectbox(
+                "Subject for rows without one", SUBJECT_LIST, key="question_import_subject"
+            )
+
+            if import_file and st.button("Import Questions"):
+                try:
+                    df_import = parse_question_file(import_file, default_subject)
+                    rows, report = prepare_question_import(df_import, get_question_hashes())
+
+                    progress_bar = st.progress(0.0, text="Importing questions...")
+                    inserted = bulk_insert_questions(
+                        rows,
+                        progress=lambda done, total: progress_bar.progress(
+                            done / total, text=f"Imported {done} of {total} questions"
+                        )
+                    )
+                    st.success(
+                        f"Imported {inserted} of {report['read']} questions "
+                        f"({report['duplicates']} duplicates and {report['invalid']} invalid rows skipped)."
+                    )
+                except Exception as e:
+                    st.error(f"Error importing questions: {str(e)}")
+
+        with export_tab:
+            export_format = st.selectbox(
+                "Format",
+                available_export_formats(),
+                key="question_export_format"
+            )
+            if st.button("Prepare Export", key="prepare_question_export"):
+                prepare_export_file(
+                    'question_export_file',
+                    [(None, iter_table_chunks("question_bank", QUESTION_DTYPES))],
+                    export_format
+                )
+            render_export_download(
+                'question_export_file', "Download Question Bank", "question_bank", export_format
+            )
+
+        with duplicates_tab:
+            if st.button("Find Near-Duplicates"):
+                st.session_state.duplicate_groups = sync_duplicate_index().groups()
+
+            duplicate_groups = st.session_state.get("duplicate_groups")
+            if duplicate_groups is not None:
+                if not duplicate_groups:
+                    st.info("No near-duplicate questions found.")
+                else:
+                    extra_ids = [question_id for group in duplicate_groups for question_id in group[1:]]
+                    st.write(f"{len(duplicate_groups)} groups, {len(extra_ids)} questions could be removed.")
+
+                    questions_by_id = {
+                        row["id"]: row
+                        for row in get_question_page([i for group in duplicate_groups for i in group])
+                    }
+                    st.dataframe(pd.DataFrame([
+                        {"Group": n, "ID": question_id,
+                         "Subject": questions_by_id[question_id]["subject"],
+                         "Question": questions_by_id[question_id]["question"]}
+                        for n, group in enumerate(duplicate_groups, start=1)
+                        for question_id in group if question_id in questions_by_id
+                    ]), hide_index=True)
+
+                    if st.button("Delete duplicates (keep the oldest of each group)"):
+                        if delete_questions(extra_ids):
+                            del st.session_state.duplicate_groups
+                            st.success(f"Deleted {len(extra_ids)} duplicate questions.")
+                            st.rerun()
+
     try:
-        questions = get_all_questions()
-        if questions:
+        df_index = load_question_id_frame(question_bank_version())
+        if len(df_index) > 0:
             st.header("Existing Questions")
 
             search_term = st.text_input("Search questions (by subject or content):")
 
-            df_questions = pd.DataFrame(questions)
-
             if search_term:
-                mask = (
-                    df_questions['subject'].str.contains(search_term, case=False, na=False) |
-                    df_questions['question'].str.contains(search_term, case=False, na=False) |
-                    df_questions['answer'].str.contains(search_term, case=False, na=False)
+                rank = {qid: i for i, qid in enumerate(sync_question_index().search(search_term))}
+                df_index = df_index[df_index['id'].isin(rank)].sort_values(
+                    'id', key=lambda ids: ids.map(rank)
                 )
-                df_questions = df_questions[mask]
 
-            subjects = df_questions['subject'].unique()
+            subject_counts = df_index.groupby('subject').size()
 
-            for subject in subjects:
-                with st.expander(f"{subject} ({len(df_questions[df_questions['subject'] == subject])} questions)"):
-                    subject_questions = df_questions[df_questions['subject'] == subject]
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                subject_filter = st.selectbox(
+                    "Subject",
+                    ["All subjects", *subject_counts.index],
+                    format_func=lambda s: (
+                        f"All subjects ({len(df_index)} questions)" if s == "All subjects"
+                        else f"{s} ({subject_counts[s]} questions)"
+                    ),
+                    key="question_subject_filter"
+                )
+            with col2:
+                page_size = st.selectbox("Per page", QUESTION_PAGE_SIZES, key="question_page_size")
 
-                    for _, row in subject_questions.iterrows():
-                        st.markdown("---")
-                        st.markdown(f"**Question:** {row['question']}")
-                        if row['answer']:
-                            st.markdown(f"**Answer:** {row['answer']}")
-
-                        if st.button(f"Delete Question {row['id']}", key=f"del_{row['id']}"):
-                            try:
-                                response = supabase.table("question_bank").delete().eq('id', row['id']).execute()
-                                if hasattr(response, 'data'):
-                                    st.success(f"Question {row['id']} deleted successfully!")
-                                    st.rerun()
-                            except Exception as e:
-                                st.error(f"Error deleting question: {str(e)}")
+            if subject_filter != "All subjects":
+                df_index = df_index[df_index['subject'] == subject_filter]
+
+            total_pages = max(1, -(-len(df_index) // page_size))
+            if st.session_state.get("question_page", 1) > total_pages:
+                st.session_state.question_page = total_pages
+            page_number = st.number_input(
+                f"Page (of {total_pages})", min_value=1, max_value=total_pages, step=1,
+                key="question_page"
+            )
+
+            start = (page_number - 1) * page_size
+            page_ids = df_index['id'].iloc[start:start + page_size].tolist()
+
+            if not page_ids:
+                st.info("No questions match your search.")
+
+            for row in get_question_page(page_ids):
+                st.markdown("---")
+                st.markdown(f"**{row['subject']}** · **Question:** {row['question']}")
+                if row['answer']:
+                    st.markdown(f"**Answer:** {row['answer']}")
+
+                if st.button(f"Delete Question {row['id']}", key=f"del_{row['id']}"):
+                    if delete_question(row['id']):
+                        st.success(f"Question {row['id']} deleted successfully!")
+                        st.rerun()
         else:
             st.info("No questions added yet. Use the form above to add questions.")
 
     except Exception as e:
         st.error(f"Error loading questions: {str(e)}")
 
+def render_mock_timer():
+    """Shows the time left in the running mock test.
+
+    When the time runs out it asks for one full rerun, which submits the test before the timer is drawn again.
+    """
+    test = st.session_state.get("mock_test")
+    if not test:
+        return
+    remaining = int(test["deadline"] - time.time())
+    if remaining <= 0:
+        if not test.get("expired"):
+            test["expired"] = True
+            st.rerun()
+        return
+    mins, secs = divmod(remaining, 60)
+    st.markdown(f"### Time left: {mins:02d}:{secs:02d}")
+
+def mock_test_page():
+    st.title("Mock Tests")
+    st.subheader("Take Timed Tests and Analyse Your Scores")
+
+    tab1, tab2 = st.tabs(["Take Test", "Score Analysis"])
+
+    with tab1:
+        test = st.session_state.get("mock_test")
+
+        if test is None:
+            subject_ids = get_subject_question_ids()
+            if not subject_ids:
+                st.info("Add questions to the Question Bank to take a mock test.")
+            else:
+                with st.form("mock_test_form"):
+                    subjects = st.multiselect(
+                        "Subjects",
+                        list(subject_ids),
+                        default=list(subject_ids),
+                        format_func=lambda s: f"{s} ({len(subject_ids[s])} questions)"
+                    )
+                    size = st.selectbox("Number of Questions", MOCK_TEST_SIZES)
+                    duration = st.selectbox("Duration (minutes)", MOCK_TEST_DURATIONS, index=1)
+                    start = st.form_submit_button("Start Test")
+
+                    if start:
+                        question_ids = sample_mock_questions(subject_ids, subjects, size)
+                        if question_ids:
+                            started_at = time.time()
+                            st.session_state.mock_test = {
+                                "questions": get_question_page(question_ids),
+                                "started_at": started_at,
+                                "deadline": started_at + duration * 60,
+                                "duration": duration
+                            }
+                            st.rerun()
+                        else:
+                            st.error("Please select at least one subject with questions.")
+
+            last_result = st.session_state.get("mock_result")
+            if last_result:
+                st.markdown("### Last Result")
+                st.metric("Score", f"{last_result['score']:.1f}%",
+                          help=f"{last_result['correct']} of {last_result['graded']} graded questions correct")
+                st.dataframe(pd.DataFrame(last_result["results"]), hide_index=True)
+        else:
+            # Answers are plain widgets, not a form, so what was typed is in session_state
+            # even when the deadline submits the test before anyone presses the button
+            time_up = time.time() >= test["deadline"]
+            submitted = False
+            if not time_up:
+                if hasattr(st, "fragment"):
+                    st.fragment(run_every=1)(render_mock_timer)()
+                else:
+                    render_mock_timer()
+
+                for number, q in enumerate(test["questions"], start=1):
+                    st.markdown(f"**Q{number}. ({q['subject']})** {q['question']}")
+                    st.text_input("Your answer", key=f"mock_answer_{q['id']}")
+                submitted = st.button("Submit Test")
+
+            if submitted or time_up:
+                answers = {
+                    q["id"]: st.session_state.get(f"mock_answer_{q['id']}", "")
+                    for q in test["questions"]
+                }
+                results, subject_totals = score_mock_test(test["questions"], answers)
+                record_mock_attempt(test, results, subject_totals)
+
+                graded = [r for r in results if r["correct"] is not None]
+                correct = sum(1 for r in graded if r["correct"])
+                st.session_state.mock_result = {
+                    "score": correct / len(graded) * 100 if graded else 0.0,
+                    "correct": correct,
+                    "graded": len(graded),
+                    "results": results
+                }
+                for q in test["questions"]:
+                    st.session_state.pop(f"mock_answer_{q['id']}", None)
+                del st.session_state.mock_test
+                st.rerun()
+
+    with tab2:
+        accuracy = get_subject_accuracy()
+        if not accuracy:
+            st.info("No mock tests taken yet.")
+        else:
+            df_accuracy = pd.DataFrame(accuracy)
+            df_accuracy["accuracy"] = (
+                df_accuracy["correct"] / df_accuracy["attempted"].where(df_accuracy["attempted"] > 0) * 100
+            ).round(1)
+            df_accuracy = df_accuracy.sort_values("accuracy")
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Questions Graded", int(df_accuracy["attempted"].sum()))
+            with col2:
+                st.metric("Correct Answers", int(df_accuracy["correct"].sum()))
+            with col3:
+                overall = df_accuracy["correct"].sum() / max(df_accuracy["attempted"].sum(), 1) * 100
+                st.metric("Overall Accuracy", f"{overall:.1f}%")
+
+            fig = px.bar(df_accuracy, x="accuracy", y="subject", orientation="h",
+                         title="Accuracy by Subject",
+                         labels={"accuracy": "Accuracy (%)", "subject": "Subject"})
+            st.plotly_chart(fig, use_container_width=True, key='mock_accuracy')
+
+            attempts = get_mock_attempts()
+            if attempts:
+                df_attempts = pd.DataFrame(attempts).sort_values("id")
+                df_attempts["submitted_at"] = pd.to_datetime(df_attempts["submitted_at"])
+                fig = px.line(df_attempts, x="submitted_at", y="score", markers=True,
+                              title="Score per Attempt",
+                              labels={"submitted_at": "Date", "score": "Score (%)"})
+                st.plotly_chart(fig, use_container_width=True, key='mock_scores')
+                st.dataframe(df_attempts.sort_values("id", ascending=False), hide_index=True)
+
+def review_page():
+    st.title("Daily Review")
+    st.subheader("Spaced Repetition for Questions and Revision Notes")
+
+    try:
+        if "review_queue" not in st.session_state:
+            seed_review_states()
+            states = get_due_reviews()
+            st.session_state.review_queue = states
+            st.session_state.review_items = get_review_items(states)
+            st.session_state.pending_reviews = {}
+
+        queue = st.session_state.review_queue
+        items = st.session_state.review_items
+        pending = st.session_state.pending_reviews
+        if flush_review_outcomes(force=False):
+            pending = st.session_state.pending_reviews
+
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.metric("Due Today", len(queue))
+        with col2:
+            if st.button("Save & Refresh"):
+                if flush_review_outcomes():
+                    del st.session_state.review_queue
+                    st.rerun()
+
+        # Skip states whose question or note has been deleted since the queue was loaded
+        while queue and (queue[0]["item_type"], queue[0]["item_id"]) not in items:
+            queue.pop(0)
+
+        if not queue:
+            flush_review_outcomes()
+            st.success("All caught up! No reviews due today.")
+            return
+
+        state = queue[0]
+        item = items[(state["item_type"], state["item_id"])]
+
+        with st.container(border=True):
+            if state["item_type"] == "question":
+                st.markdown(f"**{item['subject']} · Question:** {item['question']}")
+            else:
+                st.markdown(f"**{item['subject']} · Note:** {item['short_notes'] or item['formula']}")
+
+            if st.session_state.get("review_revealed"):
+                if state["item_type"] == "question":
+                    st.markdown(f"**Answer:** {item['answer'] or 'No answer provided'}")
+                elif item["formula"]:
+                    st.markdown(f"**Formula:** {item['formula']}")
+            elif st.button("Show Answer"):
+                st.session_state.review_revealed = True
+                st.rerun()
+
+        grade_cols = st.columns(len(REVIEW_GRADES))
+        for col, (label, quality) in zip(grade_cols, REVIEW_GRADES.items()):
+            with col:
+                if st.button(label, key=f"grade_{label}", use_container_width=True):
+                    updated = schedule_review(state, quality)
+                    if not pending:
+                        st.session_state.pending_reviews_since = time.monotonic()
+                    pending[(state["item_type"], state["item_id"])] = updated
+                    queue.pop(0)
+                    st.session_state.review_revealed = False
+                    flush_review_outcomes(force=False)
+                    st.rerun()
+
+        if pending:
+            st.caption(f"{len(pending)} reviews waiting to be saved.")
+
+    except Exception as e:
+        st.error(f"Error loading reviews: {str(e)}")
+
+def render_resource_thumbnail(row):
+    """Shows a lazy-loaded preview, queueing it for rendering the first time it is missing."""
+    blob_hash = row.get('blob_hash')
+    if not blob_hash or not row.get('filename'):
+        return
+    ingestor = get_upload_ingestor()
+    url = ingestor.thumbnail_url(blob_hash)
+    if url:
+        st.markdown(
+            f'<img src="{url}" loading="lazy" width="120" alt="{html.escape(row["title"] or "")}">',
+            unsafe_allow_html=True
+        )
+    elif os.path.exists(row['filename']):
+        ingestor.submit(blob_hash, row['filename'])
+
+def render_resource_download(row):
+    """Links to a stored file without reading it; files outside static/ are only read on request."""
+    file_name = row.get('original_name') or os.path.basename(row['filename'])
+    url = static_url(row['filename'])
+    if url and os.path.exists(row['filename']):
+        st.markdown(
+            f'<a href="{url}" download="{html.escape(file_name)}" target="_blank">Download File</a>',
+            unsafe_allow_html=True
+        )
+        return
+
+    load_key = f"load_res_{row['id']}"
+    if not st.session_state.get(load_key):
+        if st.button("Prepare Download", key=f"prep_res_{row['id']}"):
+            st.session_state[load_key] = True
+            st.rerun()
+        return
+
+    try:
+        if os.path.exists(row['filename']):
+            with open(row['filename'], "rb") as file:
+                st.download_button(
+                    label="Download File",
+                    data=file,
+                    file_name=file_name,
+                    mime="application/octet-stream",
+                    key=f"dl_res_{row['id']}"
+                )
+        else:
+            st.warning("File not found on disk.")
+    except Exception as e:
+        st.error(f"Error accessing file: {str(e)}")
+
 def resources_page():
     st.title("Resources")
     st.subheader("Store Resource Links and Files")
@@ -908,21 +3576,19 @@ def resources_page():
             if submit:
                 if subject and resource_title and (resource_link or uploaded_file):
                     filename = None
+                    blob_hash = None
+                    original_name = None
                     if uploaded_file:
                         try:
-                            upload_folder = "uploads"
-                            os.makedirs(upload_folder, exist_ok=True)
-
-                            file_path = os.path.join(upload_folder, uploaded_file.name)
-                            with open(file_path, "wb") as f:
-                                f.write(uploaded_file.getbuffer())
-                            filename = file_path
+                            blob_hash, filename = ingest_upload(uploaded_file)
+                            original_name = uploaded_file.name
 
                         except Exception as e:
                             st.error(f"Error saving file: {str(e)}")
                             filename = None
 
-                    if insert_resource(subject, resource_title, resource_link, filename):
+                    if insert_resource(subject, resource_title, resource_link, filename,
+                                       blob_hash, original_name):
                         st.success("Resource added successfully!")
                         st.rerun()
                 else:
@@ -950,31 +3616,17 @@ def resources_page():
 
                     for _, row in subject_resources.iterrows():
                         st.markdown("---")
+                        render_resource_thumbnail(row)
                         st.markdown(f"**Title:** {row['title']}")
 
                         if row['link']:
                             st.markdown(f"**Link:** [{row['link']}]({row['link']})")
 
                         if row['filename']:
-                            try:
-                                if os.path.exists(row['filename']):
-                                    with open(row['filename'], "rb") as file:
-                                        st.download_button(
-                                            label="Download File",
-                                            data=file,
-                                            file_name=os.path.basename(row['filename']),
-                                            mime="application/octet-stream"
-                                        )
-                            except Exception as e:
-                                st.error(f"Error accessing file: {str(e)}")
+                            render_resource_download(row)
 
                         if st.button(f"Delete Resource {row['id']}", key=f"del_res_{row['id']}"):
                             if delete_resource(row['id']):
-                                if row['filename'] and os.path.exists(row['filename']):
-                                    try:
-                                        os.remove(row['filename'])
-                                    except Exception as e:
-                                        st.error(f"Error deleting file: {str(e)}")
                                 st.success(f"Resource {row['id']} deleted successfully!")
                                 st.rerun()
         else:
@@ -995,11 +3647,27 @@ def study_goals_page():
             initial_achieved = st.number_input("Initial Achieved Hours (Optional)",
                 min_value=0.0, step=0.5)
 
+            auto_track = st.checkbox("Count matching study sessions automatically", value=True)
+            schedules = get_all_schedules()
+            track_col1, track_col2 = st.columns(2)
+            with track_col1:
+                goal_subject = st.selectbox("Subject", ["Any"] + SUBJECT_LIST)
+                start_date = st.date_input("From (optional)", value=None)
+            with track_col2:
+                goal_phase = st.selectbox("Phase", ["Any"] + list(schedules.keys()))
+                end_date = st.date_input("Until (optional)", value=None)
+
             submit = st.form_submit_button("Add Goal")
 
             if submit:
                 if description and target_hours > 0:
-                    if insert_study_goal(description, target_hours, initial_achieved):
+                    if insert_study_goal(
+                        description, target_hours, initial_achieved, auto_track,
+                        subject=None if goal_subject == "Any" else goal_subject,
+                        phase=None if goal_phase == "Any" else goal_phase,
+                        start_date=start_date,
+                        end_date=end_date
+                    ):
                         st.success("Study goal added successfully!")
                         st.rerun()
                 else:
@@ -1025,6 +3693,19 @@ def study_goals_page():
             with col3:
                 st.metric("Overall Progress", f"{overall_progress:.1f}%")
 
+            manual_goals = [goal for goal in goals if not goal.get('auto_track')]
+            if manual_goals:
+                with st.form("update_goal_hours"):
+                    goal_labels = {goal['id']: goal['description'] for goal in manual_goals}
+                    goal_id = st.selectbox(
+                        "Goal", list(goal_labels), format_func=goal_labels.get
+                    )
+                    additional_hours = st.number_input("Add Hours", min_value=0.0, step=0.5)
+                    if st.form_submit_button("Update"):
+                        if update_goal_achievement(goal_id, additional_hours):
+                            st.success("Goal updated successfully!")
+                            st.rerun()
+
             st.subheader("Individual Goals")
             for _, goal in df_goals.iterrows():
                 with st.expander(f"Goal: {goal['description']}"):
@@ -1040,25 +3721,18 @@ def study_goals_page():
                     with col3:
                         st.metric("Progress", f"{progress:.1f}%")
 
-                    with st.form(f"update_goal_{goal['id']}"):
-                        additional_hours = st.number_input(
-                            "Add Hours",
-                            min_value=0.0,
-                            step=0.5,
-                            key=f"add_hours_{goal['id']}"
-                        )
-                        update_col1, update_col2 = st.columns([1, 4])
-                        with update_col1:
-                            if st.form_submit_button("Update"):
-                                if update_goal_achievement(goal['id'], additional_hours):
-                                    st.success("Goal updated successfully!")
-                                    st.rerun()
-
-                        with update_col2:
-                            if st.form_submit_button("Delete Goal"):
-                                if delete_study_goal(goal['id']):
-                                    st.success("Goal deleted successfully!")
-                                    st.rerun()
+                    if goal.get('auto_track'):
+                        scope = [
+                            goal.get('subject') or "all subjects",
+                            goal.get('phase') or "all phases",
+                            f"{goal.get('start_date') or 'start'} to {goal.get('end_date') or 'now'}"
+                        ]
+                        st.caption("Tracking study sessions for " + ", ".join(scope))
+
+                    if st.button("Delete Goal", key=f"delete_goal_{goal['id']}"):
+                        if delete_study_goal(goal['id']):
+                            st.success("Goal deleted successfully!")
+                            st.rerun()
         else:
             st.info("No study goals set yet. Use the form above to add goals.")
 
@@ -1067,14 +3741,12 @@ def calendar_view_page():
     st.subheader("Interactive Study Calendar")
 
     try:
-        logs_response = supabase.table('progress_logs').select('*').order('date').execute()
+        df_logs = load_table_frame('progress_logs')
 
-        if not hasattr(logs_response, 'data') or not logs_response.data:
+        if len(df_logs) == 0:
             st.info("No study sessions logged yet. Start logging your study sessions to view them here.")
             return
 
-        df_logs = pd.DataFrame(logs_response.data)
-
         df_logs['date'] = pd.to_datetime(df_logs['date'])
 
         if len(df_logs) == 0:
@@ -1265,171 +3937,108 @@ def download_reports_page():
     st.subheader("Study Session Reports and Analytics")
 
     try:
-        logs_response = supabase.table('progress_logs').select('*').order('date').execute()
+        version = get_progress_logs_version()
+        if version is None:
+            return
 
-        if not hasattr(logs_response, 'data') or not logs_response.data:
+        if version == "0-0":
             st.info("No study sessions available to download.")
             return
 
-        logs = logs_response.data
+        runner = get_report_runner()
+        bundle = runner.load(version)
 
-        df_logs = pd.DataFrame(logs)
-        df_logs['date'] = pd.to_datetime(df_logs['date'])
-
-        st.header("Available Reports")
-
-        basic_df = df_logs[['date', 'subject', 'phase', 'hours', 'notes']]
-        st.dataframe(basic_df.reset_index(drop=True))
-
-        csv_basic = basic_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            "Download Basic Study Log (CSV)",
-            csv_basic,
-            "study_sessions_basic.csv",
-            "text/csv",
-            key='download_basic'
-        )
+        if bundle is None:
+            error = runner.error(version)
+            if error is not None:
+                # A failed build is not retried on every rerun; it would just fail the same way
+                st.error(f"Error building report: {str(error)}")
+                if st.button("Retry Report Build"):
+                    runner.submit(version)
+                    st.rerun()
+                bundle = runner.latest()
+                if bundle is None:
+                    return
+                st.info("Showing the last report that was built successfully.")
+            else:
+                job = runner.submit(version)
+                bundle = runner.latest()
+                if bundle is None:
+                    with st.spinner("Building report..."):
+                        bundle = job.result()
+                else:
+                    st.info("New study sessions were logged. The report is being rebuilt in the background; "
+                            "reload the page to see the latest figures.")
 
-        subject_summary = df_logs.groupby('subject').agg({
-            'hours': ['sum', 'mean', 'count'],
-            'date': 'nunique'
-        }).round(2)
-        subject_summary.columns = ['Total Hours', 'Avg Hours/Session', 'Number of Sessions', 'Number of Days']
-        st.dataframe(subject_summary.reset_index())
-
-        csv_subject = subject_summary.to_csv().encode('utf-8')
-        st.download_button(
-            "Download Subject Summary (CSV)",
-            csv_subject,
-            "subject_summary.csv",
-            "text/csv",
-            key='download_subject'
-        )
+        tables = bundle['tables']
+        stats = bundle['stats']
 
-        daily_summary = df_logs.groupby('date').agg({
-            'hours': ['sum', 'count'],
-            'subject': 'nunique'
-        }).round(2)
-        daily_summary.columns = ['Total Hours', 'Number of Sessions', 'Subjects Covered']
-        st.dataframe(daily_summary.reset_index())
-
-        csv_daily = daily_summary.to_csv().encode('utf-8')
-        st.download_button(
-            "Download Daily Summary (CSV)",
-            csv_daily,
-            "daily_summary.csv",
-            "text/csv",
-            key='download_daily'
-        )
+        st.header("Available Reports")
 
-        phase_summary = df_logs.groupby('phase').agg({
-            'hours': ['sum', 'mean', 'count'],
-            'subject': 'nunique',
-            'date': 'nunique'
-        }).round(2)
-        phase_summary.columns = ['Total Hours', 'Avg Hours/Session', 'Number of Sessions',
-                               'Unique Subjects', 'Number of Days']
-        st.dataframe(phase_summary.reset_index())
-
-        csv_phase = phase_summary.to_csv().encode('utf-8')
-        st.download_button(
-            "Download Phase Summary (CSV)",
-            csv_phase,
-            "phase_summary.csv",
-            "text/csv",
-            key='download_phase'
-        )
+        st.dataframe(tables['Basic Study Log'].reset_index(drop=True))
+        st.dataframe(tables['Subject Summary'].reset_index())
+        st.dataframe(tables['Daily Summary'].reset_index())
+        st.dataframe(tables['Phase Summary'].reset_index())
+        st.dataframe(tables['Monthly Summary'].reset_index())
 
-        df_logs['month_year'] = df_logs['date'].dt.strftime('%Y-%m')
-        monthly_summary = df_logs.groupby('month_year').agg({
-            'hours': ['sum', 'mean', 'count'],
-            'subject': 'nunique',
-            'date': 'nunique'
-        }).round(2)
-        monthly_summary.columns = ['Total Hours', 'Avg Hours/Session', 'Number of Sessions',
-                                 'Unique Subjects', 'Number of Days']
-        st.dataframe(monthly_summary.reset_index())
-
-        csv_monthly = monthly_summary.to_csv().encode('utf-8')
-        st.download_button(
-            "Download Monthly Summary (CSV)",
-            csv_monthly,
-            "monthly_summary.csv",
-            "text/csv",
-            key='download_monthly'
-        )
+        st.header("Export Reports")
 
-        comprehensive_data = {
-            'study_sessions': df_logs,
-            'subject_summary': subject_summary,
-            'daily_summary': daily_summary,
-            'phase_summary': phase_summary,
-            'monthly_summary': monthly_summary
+        report_tables = {
+            name: table for name, table in tables.items()
+            if name != "Basic Study Log"
         }
 
-        combined_csv_parts = []
-
-        for section_name, df in comprehensive_data.items():
-            combined_csv_parts.append(f"\n\n{section_name.upper()}\n")
-            combined_csv_parts.append(df.to_csv())
+        col1, col2 = st.columns(2)
+        with col1:
+            report_name = st.selectbox(
+                "Report",
+                ["Basic Study Log", *report_tables, "Comprehensive Report"],
+                key='export_report'
+            )
+        with col2:
+            format_options = available_export_formats()
+            if report_name == "Comprehensive Report":
+                format_options = [fmt for fmt in format_options if fmt in SECTIONED_EXPORT_FORMATS]
+            export_format = st.selectbox("Format", format_options, key='export_format')
+
+        if st.button("Prepare Export", key='prepare_export'):
+            if report_name == "Basic Study Log":
+                sections = [(None, iter_progress_log_chunks())]
+            elif report_name == "Comprehensive Report":
+                sections = [("study_sessions", iter_progress_log_chunks())]
+                sections += [
+                    (name.lower().replace(" ", "_"), [table.reset_index()])
+                    for name, table in report_tables.items()
+                ]
+            else:
+                sections = [(None, [report_tables[report_name].reset_index()])]
 
-        combined_csv = "\n".join(combined_csv_parts)
+            prepare_export_file('export_file', sections, export_format, report=report_name)
 
-        st.download_button(
-            "Download Comprehensive Report (CSV)",
-            combined_csv.encode('utf-8'),
-            "comprehensive_study_report.csv",
-            "text/csv",
-            key='download_comprehensive'
+        render_export_download(
+            'export_file',
+            f"Download {report_name}",
+            report_name.lower().replace(" ", "_"),
+            export_format,
+            report=report_name
         )
 
         st.header("Overall Statistics")
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Total Study Hours", f"{df_logs['hours'].sum():.1f}")
+            st.metric("Total Study Hours", f"{stats['total_hours']:.1f}")
         with col2:
-            st.metric("Total Sessions", len(df_logs))
+            st.metric("Total Sessions", stats['total_sessions'])
         with col3:
-            st.metric("Days Studied", df_logs['date'].nunique())
+            st.metric("Days Studied", stats['days_studied'])
         with col4:
-            avg_hours_per_day = df_logs['hours'].sum() / df_logs['date'].nunique()
-            st.metric("Avg Hours/Day", f"{avg_hours_per_day:.1f}")
+            st.metric("Avg Hours/Day", f"{stats['avg_hours_per_day']:.1f}")
 
         st.header("Study Progress Visualizations")
 
-        fig1 = px.line(
-            df_logs.groupby('date')['hours'].sum().reset_index(),
-            x='date',
-            y='hours',
-            title='Daily Study Hours'
-        )
-        st.plotly_chart(fig1, use_container_width=True)
-
-        fig2 = px.pie(
-            df_logs.groupby('subject')['hours'].sum().reset_index(),
-            values='hours',
-            names='subject',
-            title='Study Hours by Subject'
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-
-        fig3 = px.bar(
-            df_logs.groupby('phase')['hours'].sum().reset_index(),
-            x='phase',
-            y='hours',
-            title='Study Hours by Phase'
-        )
-        st.plotly_chart(fig3, use_container_width=True)
-
-        monthly_progress = df_logs.groupby('month_year')['hours'].sum().reset_index()
-        fig4 = px.bar(
-            monthly_progress,
-            x='month_year',
-            y='hours',
-            title='Monthly Study Progress'
-        )
-        st.plotly_chart(fig4, use_container_width=True)
+        for figure_json in bundle['figures'].values():
+            st.plotly_chart(pio.from_json(figure_json), use_container_width=True)
 
     except Exception as e:
         st.error(f"Error generating reports: {str(e)}")
@@ -1537,15 +4146,12 @@ def rag_assistant_page():
     if uploaded_file and st.button("Process PDF"):
         try:
             with st.spinner("Converting PDF to images..."):
-                upload_folder = "uploads"
-                images_folder = os.path.join(upload_folder, "images")
-                os.makedirs(upload_folder, exist_ok=True)
+                images_folder = os.path.join(UPLOAD_DIR, "images")
                 os.makedirs(images_folder, exist_ok=True)
 
-                # Save the PDF file
-                file_path = os.path.join(upload_folder, uploaded_file.name)
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                # Render straight from the upload: these PDFs never become resources, so they stay
+                # out of the blob store, where nothing would ever release them
+                blob_hash = hash_upload(uploaded_file)
 
                 # Use PyMuPDF for PDF to image conversion
                 try:
@@ -1556,11 +4162,11 @@ def rag_assistant_page():
                     zoom_factor = 300 / 72
                     
                     # Open the PDF document
-                    pdf_document = pymupdf.open(file_path)
+                    pdf_document = pymupdf.open(stream=uploaded_file.getvalue(), filetype="pdf")
                     image_paths = []
                     
-                    # Get the base name of the PDF file (without extension)
-                    base_name = os.path.splitext(uploaded_file.name)[0]
+                    # Name page images by content so identically named PDFs do not collide
+                    base_name = blob_hash[:16]
                     
                     # Process each page
                     for page_number in range(len(pdf_document)):
@@ -1700,6 +4306,12 @@ def chat_assistant_page():
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
 
+    context_subject = st.selectbox(
+        "Ground answers in your study data for",
+        ["No subject", *SUBJECT_LIST],
+        key="chat_context_subject"
+    )
+
     for msg in st.session_state.chat_history:
         with st.chat_message(msg["role"]):
             st.write(msg["content"])
@@ -1722,8 +4334,17 @@ def chat_assistant_page():
                 api_version="2024-12-01-preview"
             )
 
+            system_prompt = "You are a helpful study assistant."
+            if context_subject != "No subject":
+                context = get_rag_context(context_subject)[:RAG_CONTEXT_MAX_CHARS]
+                if context:
+                    system_prompt += (
+                        f" Use the student's own {context_subject} material below when it is relevant."
+                        f"\n\n{context}"
+                    )
+
             messages = [
-                SystemMessage("You are a helpful study assistant."),
+                SystemMessage(system_prompt),
                 *[UserMessage(msg["content"]) if msg["role"] == "user"
                   else AssistantMessage(msg["content"])
                   for msg in st.session_state.chat_history]
@@ -1748,7 +4369,21 @@ def chat_assistant_page():
         except Exception as e:
             st.error(f"Error: {str(e)}")
 
+@st.cache_resource
+def initialize_app():
+    """Runs the one-time database seed step for this process and records how long startup took."""
+    started = time.perf_counter()
+    sweep_exports()
+    seeded = init_db()
+    migrate_log_dates()
+    return {"seeded": seeded, "init_seconds": time.perf_counter() - started}
+
 def main():
+    try:
+        startup = initialize_app()
+    except Exception as e:
+        st.error(f"Error initializing database: {str(e)}")
+        startup = None
     load_css()
 
     pages = {
@@ -1757,6 +4392,8 @@ def main():
         "Progress Analytics": analytics_page,
         "Revision Hub": revision_hub_page,
         "Question Bank": question_bank_page,
+        "Mock Tests": mock_test_page,
+        "Daily Review": review_page,
         "Resources": resources_page,
         "Study Goals": study_goals_page,
         "Calendar View": calendar_view_page,
@@ -1767,9 +4404,22 @@ def main():
     }
 
     selection = st.sidebar.radio("Navigation", list(pages.keys()))
+    if startup:
+        st.sidebar.caption(f"Database ready in {startup['init_seconds'] * 1000:.0f} ms")
+    storage = get_storage()
+    if not storage.healthy:
+        st.sidebar.warning("Database unreachable. Showing saved snapshots where available; changes cannot be saved.")
+    with st.sidebar.expander("Database Metrics"):
+        metrics = storage.metrics_summary()
+        if metrics:
+            st.dataframe(pd.DataFrame(metrics).round(1), hide_index=True)
 
     load_page_specific_css(selection)
 
+    # Retry review grades that failed to save before leaving the review page
+    if selection != "Daily Review":
+        flush_review_outcomes()
+
     pages[selection]()
 
 if __name__ == '__main__':
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# app.py is a single-file Streamlit script at the repository root. Importing it needs everything in
+# requirements.txt; a missing package fails collection loudly rather than skipping the tests.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+import app
+
+
+def noisy_series(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=float)
+    y = np.sin(x / 200) + rng.normal(0, 0.05, n)
+    return x, y
+
+
+def test_lttb_keeps_endpoints():
+    x, y = noisy_series()
+    keep = app.lttb_indices(x, y, 100)
+    assert keep[0] == 0
+    assert keep[-1] == len(x) - 1
+
+
+def test_lttb_output_size_equals_threshold():
+    x, y = noisy_series()
+    for threshold in (3, 10, 100, 800):
+        keep = app.lttb_indices(x, y, threshold)
+        assert len(keep) == threshold
+        assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_peaks_and_troughs():
+    x, y = noisy_series()
+    peak, trough = 1234, 3456
+    y[peak], y[trough] = 50.0, -50.0
+    keep = app.lttb_indices(x, y, 100)
+    assert peak in keep
+    assert trough in keep
+
+
+def test_lttb_passes_through_at_or_below_threshold():
+    x, y = noisy_series(n=50)
+    np.testing.assert_array_equal(app.lttb_indices(x, y, 50), np.arange(50))
+    np.testing.assert_array_equal(app.lttb_indices(x, y, 80), np.arange(50))
+
+
+def test_downsample_series_passes_small_frames_through():
+    df = pd.DataFrame({"date": pd.date_range("2026-01-01", periods=30), "hours": range(30)})
+    assert app.downsample_series(df, "date", "hours", max_points=30) is df
+
+
+def test_downsample_series_reduces_datetime_series():
+    x, y = noisy_series()
+    y[1234], y[3456] = 50.0, -50.0
+    df = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=len(x), freq="h"), "hours": y})
+    df = df.sample(frac=1, random_state=0)
+    result = app.downsample_series(df, "date", "hours", max_points=200)
+    assert len(result) == 200
+    assert result["date"].is_monotonic_increasing
+    assert result["date"].iloc[0] == df["date"].min()
+    assert result["date"].iloc[-1] == df["date"].max()
+    assert result["hours"].max() == 50.0
+    assert result["hours"].min() == -50.0
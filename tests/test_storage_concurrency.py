@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+import app
+
+
+THREADS = 8
+INCREMENTS = 50
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = app.SQLiteStorage(tmp_path / "data_hub.db")
+    yield storage
+    storage.engine.dispose()
+
+
+def run_concurrently(worker):
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def run():
+        barrier.wait()
+        try:
+            for _ in range(INCREMENTS):
+                worker()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_concurrent_goal_increments_are_not_lost(storage):
+    goal = storage.insert("study_goals", {"description": "Signals", "target_hours": 100, "achieved_hours": 0})[0]
+
+    run_concurrently(lambda: storage.increment("study_goals", "achieved_hours", {goal["id"]: 0.5}))
+
+    achieved = storage.select("study_goals", filters={"id": goal["id"]})[0]["achieved_hours"]
+    assert achieved == THREADS * INCREMENTS * 0.5
+
+
+def test_concurrent_accuracy_increments_by_subject_are_not_lost(storage):
+    storage.upsert("subject_accuracy", [{"subject": "Networks", "attempted": 0, "correct": 0}], on_conflict="subject")
+
+    def record():
+        storage.increment("subject_accuracy", "attempted", {"Networks": 3}, key="subject")
+        storage.increment("subject_accuracy", "correct", {"Networks": 1}, key="subject")
+
+    run_concurrently(record)
+
+    row = storage.select("subject_accuracy", filters={"subject": "Networks"})[0]
+    assert row["attempted"] == THREADS * INCREMENTS * 3
+    assert row["correct"] == THREADS * INCREMENTS